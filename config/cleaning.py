@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Limpeza vetorizada dos valores nutricionais
+Aplica a mesma regra de extractor.clean_nutritional_value a colunas inteiras
+de um DataFrame com os textos brutos extraídos (ex: "236 kcal", "0,5 g",
+"235 = 987"), usando operações de string do pandas em vez de um laço por célula
+"""
+
+import logging
+import re
+from typing import Optional
+
+import pandas as pd
+
+from extractor import NUMBER_PATTERN, REQUIRED_FIELDS
+
+
+_logger = logging.getLogger(__name__)
+
+# Primeiro número antes de qualquer símbolo separador de extractor.CALORIAS_SEPARATOR_PATTERN
+# ("235 = 987" -> "235"), em uma única busca em vez de split + search
+CALORIAS_NUMBER_PATTERN = re.compile(r'^[^=\\/|&%#\d,\.]*([\d,\.]+)')
+
+
+def clean_series(values: pd.Series, field: str = "") -> pd.Series:
+    """
+    Limpa uma coluna inteira de valores nutricionais
+
+    Equivale a aplicar clean_nutritional_value(valor, field) em cada célula
+
+    Args:
+        values: Textos brutos (valores ausentes resultam em "0")
+        field: Nome do campo (para tratamento especial de calorias)
+
+    Returns:
+        Série de texto com os valores limpos (ex: "236", "0.5")
+    """
+    values = values.astype(object).where(values.notna(), '').astype(str)
+    # Os textos se repetem muito entre produtos ("0 g", "0,0 g"...): limpa cada
+    # valor distinto uma vez e espalha o resultado pelos códigos do factorize
+    codes, uniques = pd.factorize(values)
+    pattern = CALORIAS_NUMBER_PATTERN if field == 'CALORIAS (kcal)' else NUMBER_PATTERN
+    numbers = pd.Series(uniques).str.extract(pattern, expand=False)
+    cleaned = numbers.str.replace(',', '.', regex=False).fillna('0').to_numpy()
+    return pd.Series(cleaned.take(codes), index=values.index).astype(str)
+
+
+def clean_nutritional_frame(df: pd.DataFrame, logger: Optional[logging.Logger] = None) -> pd.DataFrame:
+    """
+    Limpa um DataFrame de linhas brutas (saída de build_raw_row)
+
+    O resultado é idêntico ao de build_product_row linha a linha: porção sem
+    'g', nutrientes limpos e campos obrigatórios ausentes preenchidos com "0"
+
+    Args:
+        df: DataFrame com os textos brutos extraídos
+        logger: Logger para o resumo de campos ausentes (opcional)
+
+    Returns:
+        Novo DataFrame com os valores limpos
+    """
+    logger = logger or _logger
+    df = df.copy()
+    if 'PORCAO (g)' in df.columns:
+        df['PORCAO (g)'] = df['PORCAO (g)'].astype(str).str.replace('g', '', regex=False)
+    for field in REQUIRED_FIELDS:
+        if field not in df.columns:
+            df[field] = None
+        missing = int(df[field].isna().sum())
+        if missing:
+            logger.warning("Campo %s não encontrado em %d produto(s), definindo como 0", field, missing)
+        # Ausente vira "0", assim como clean_nutritional_value("") -> "0"
+        df[field] = clean_series(df[field], field)
+    return df
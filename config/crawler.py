@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crawler em largura (BFS) do catálogo da Perdigão
+Parte de /produtos/ e segue os links nível a nível, baixando as páginas de
+cada nível em paralelo. O URLClassifier define o escopo (só raiz, seções e
+subcategorias do catálogo são visitadas; produtos são coletados sem download)
+e o conjunto de visitados pode ser exato ou um filtro de Bloom, para catálogos
+muito grandes com memória fixa
+"""
+
+import hashlib
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import http_client
+from metrics import RunMetrics
+from rate_control import RequestBudget
+from url_classifier import PRODUCT, ROOT, SECTION, SUBCATEGORY, URLClassifier
+
+
+# Páginas de listagem que o crawler baixa para descobrir links
+LISTING_LABELS = (ROOT, SECTION, SUBCATEGORY)
+
+# Só links e a tag <base> (o site usa <base href> com links relativos)
+LINK_STRAINER = SoupStrainer(['a', 'base'])
+
+
+class BloomFilter:
+    """
+    Conjunto aproximado de tamanho fixo: nunca dá falso negativo e erra
+    "já visto" com probabilidade ~error_rate até `capacity` itens
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Número de itens esperado
+            error_rate: Taxa de falsos positivos aceita nessa capacidade
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Hash duplo (Kirsch-Mitzenmacher): k posições a partir de um único digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> bool:
+        """Adiciona o item; retorna True se ele ainda não estava no conjunto"""
+        new = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] >> bit & 1:
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p // 8] >> (p % 8) & 1 for p in self._positions(item))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class VisitedSet:
+    """Conjunto exato de URLs visitadas, com a mesma interface do BloomFilter"""
+
+    def __init__(self):
+        self._items = set()
+
+    def add(self, item: str) -> bool:
+        if item in self._items:
+            return False
+        self._items.add(item)
+        return True
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def make_visited(kind: str = 'set', capacity: int = 1_000_000):
+    """
+    Cria o conjunto de visitados
+
+    Args:
+        kind: 'set' (exato) ou 'bloom' (memória fixa, com falsos positivos raros)
+        capacity: Capacidade prevista do filtro de Bloom
+    """
+    if kind == 'bloom':
+        return BloomFilter(capacity=capacity)
+    if kind == 'set':
+        return VisitedSet()
+    raise ValueError(f"Tipo de conjunto de visitados inválido: {kind} (use set ou bloom)")
+
+
+def extract_links(content: bytes, page_url: str) -> List[str]:
+    """
+    Links absolutos da página, resolvidos contra o <base href> quando houver
+    (como faz o navegador) ou contra a própria URL da página
+    """
+    soup = BeautifulSoup(content, 'html.parser', parse_only=LINK_STRAINER)
+    base = soup.find('base', href=True)
+    base_url = urljoin(page_url, base['href']) if base else page_url
+    return [urljoin(base_url, link['href']) for link in soup.find_all('a', href=True)]
+
+
+class BFSCrawler:
+    def __init__(self, base_url: str, start_path: str = 'produtos/', max_depth: int = 3,
+                 max_pages: Optional[int] = None, workers: int = 4, rate: float = 2.0,
+                 depth_rates: Optional[Dict[int, float]] = None, visited: str = 'set',
+                 classifier: Optional[URLClassifier] = None, cache=None, archive=None,
+                 limiter=None, retrier=None, on_progress: Optional[Callable[[int, int], None]] = None,
+                 metrics: Optional[RunMetrics] = None):
+        """
+        Configura o crawler
+
+        Args:
+            base_url: Raiz do site
+            start_path: Página inicial, relativa à raiz (padrão: o catálogo /produtos/)
+            max_depth: Profundidade máxima em links a partir da página inicial
+            max_pages: Máximo de páginas de listagem baixadas (None = sem limite)
+            workers: Páginas de um mesmo nível baixadas em paralelo
+            rate: Orçamento de cortesia em requisições/s (0 = sem limite)
+            depth_rates: Orçamento próprio por nível {profundidade: requisições/s},
+                         ex: {0: 0.5} para ir devagar na página inicial
+            visited: 'set' (exato) ou 'bloom' (filtro de Bloom de memória fixa)
+            classifier: URLClassifier que define o escopo (padrão: o do base_url)
+            cache: HTTPCache para GET condicional (opcional)
+            archive: HTMLArchive onde gravar as respostas (opcional)
+            limiter: AdaptiveLimiter compartilhado (opcional)
+            retrier: Retrier para erros transitórios (opcional)
+            on_progress: Chamada como on_progress(baixadas, conhecidas) a cada página de
+                         listagem terminada; o total cresce conforme o crawl descobre páginas
+            metrics: RunMetrics onde registrar os tempos por fase de cada página
+                     (padrão: um novo RunMetrics('coletor'))
+        """
+        self.base_url = base_url
+        self.start_path = start_path
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.rate = rate
+        self.depth_rates = depth_rates or {}
+        self.classifier = classifier or URLClassifier(base_url)
+        self.visited = make_visited(visited)
+        self.cache = cache
+        self.archive = archive
+        self.limiter = limiter
+        self.retrier = retrier
+        self.on_progress = on_progress
+        self.metrics = metrics or RunMetrics('coletor')
+        self._budgets: Dict[int, RequestBudget] = {}
+        self.stats = {'pages': 0, 'failed': 0, 'links': 0, 'out_of_scope': 0, 'products': 0}
+
+    def budget(self, depth: int) -> RequestBudget:
+        """Orçamento do nível: o de depth_rates, ou o geral"""
+        if depth not in self._budgets:
+            rate = self.depth_rates.get(depth, self.rate)
+            self._budgets[depth] = RequestBudget(rate=rate, burst=self.workers)
+        return self._budgets[depth]
+
+    def fetch(self, url: str, depth: int) -> Optional[bytes]:
+        """
+        Baixa uma página de listagem passando pelo orçamento do nível, pelo
+        controlador adaptativo e pelas retentativas
+
+        Returns:
+            O HTML da página, ou None em caso de erro
+        """
+        budget = self.budget(depth)
+        timing: Dict[str, float] = {}
+
+        def request():
+            # Cada tentativa passa pelo orçamento de cortesia (a espera fica fora da medição)
+            budget.acquire()
+            with self.limiter.request() if self.limiter is not None else nullcontext() as ticket, \
+                    http_client.track_timing(timing):
+                if self.cache:
+                    response = self.cache.fetch(http_client.get_session(), url, timeout=10)
+                else:
+                    response = http_client.get(url, timeout=10)
+                    response.raise_for_status()
+                if ticket is not None:
+                    ticket.observe(response)
+            return response
+
+        try:
+            print(f"Acessando: {url}")
+            response = self.retrier.call(url, request) if self.retrier is not None else request()
+        except Exception as e:
+            print(f"Erro ao acessar {url}: {e}")
+            return None
+        self.metrics.record_network(url, timing, len(response.content))
+        if self.archive is not None:
+            self.archive.append(url, response.content, response.status_code,
+                                response.headers.get('Content-Type', ''))
+        return response.content
+
+    def _visit(self, item: Tuple[str, int]) -> Optional[List[str]]:
+        url, depth = item
+        content = self.fetch(url, depth)
+        if content is None:
+            return None
+        inicio = time.perf_counter()
+        links = extract_links(content, url)
+        self.metrics.record(url, 'parse', time.perf_counter() - inicio)
+        return links
+
+    def iter_products(self) -> Iterator[str]:
+        """
+        Percorre o catálogo em largura a partir de start_path, gerando cada URL de
+        produto assim que a página que a lista é processada
+
+        Cada nível é baixado em paralelo e os links são processados na ordem
+        das páginas, então a sequência não depende do número de workers
+
+        Yields:
+            URLs de produtos, normalizadas e sem duplicatas, na ordem de descoberta
+        """
+        start = self.classifier.normalize(urljoin(self.base_url, self.start_path))
+        self.visited.add(start)
+        frontier = [start]
+        known = 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for depth in range(self.max_depth + 1):
+                if not frontier:
+                    break
+                if self.max_pages is not None:
+                    frontier = frontier[:max(0, self.max_pages - self.stats['pages'])]
+                    if not frontier:
+                        print(f"Limite de {self.max_pages} páginas atingido")
+                        break
+                next_frontier = []
+                found = 0
+                self.budget(depth)
+                pages = executor.map(self._visit, [(url, depth) for url in frontier])
+                for links in pages:
+                    self.stats['pages'] += 1
+                    if self.on_progress is not None:
+                        self.on_progress(self.stats['pages'], known)
+                    if links is None:
+                        self.stats['failed'] += 1
+                        continue
+                    self.stats['links'] += len(links)
+                    for link in links:
+                        label, canonical = self.classifier.analyze(link)
+                        if label == PRODUCT:
+                            if self.visited.add(canonical):
+                                self.stats['products'] += 1
+                                found += 1
+                                yield canonical
+                        elif label in LISTING_LABELS:
+                            # Além da profundidade máxima o link não seria baixado: nem entra no conjunto
+                            if depth < self.max_depth and self.visited.add(canonical):
+                                next_frontier.append(canonical)
+                                known += 1
+                        else:
+                            self.stats['out_of_scope'] += 1
+                print(f"=== NÍVEL {depth}: {len(frontier)} páginas | {found} produtos novos | "
+                      f"{len(next_frontier)} páginas para o próximo nível ===")
+                frontier = next_frontier
+
+    def crawl(self) -> List[str]:
+        """Percorre o catálogo inteiro e retorna as URLs de produtos (ver iter_products)"""
+        return list(self.iter_products())
+
+    def format_stats(self) -> str:
+        """Resumo do crawl em uma linha legível"""
+        visited = f"{len(self.visited)} URLs vistas"
+        if isinstance(self.visited, BloomFilter):
+            visited += f" (filtro de Bloom, {self.visited.memory_bytes / 1024:.0f} KB)"
+        return (f"Crawler: {self.stats['pages']} páginas baixadas ({self.stats['failed']} com erro) | "
+                f"{self.stats['links']} links | {self.stats['out_of_scope']} fora do catálogo | "
+                f"{self.stats['products']} produtos | {visited}")
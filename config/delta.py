@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparação entre snapshots de produtos (delta)
+Compara o CSV anterior com o novo usando hash das linhas e junção por URL,
+gerando apenas as linhas adicionadas, removidas e alteradas
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+DADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados')
+KEY_COLUMN = 'URL'
+
+
+def find_previous_snapshot(dados_dir: str = DADOS_DIR, exclude: Optional[str] = None) -> Optional[str]:
+    """
+    Encontra o snapshot completo mais recente em dados/
+
+    Args:
+        dados_dir: Pasta com os CSVs
+        exclude: Caminho a ignorar (ex: o snapshot que acabou de ser salvo)
+
+    Returns:
+        Caminho do CSV/JSONL mais recente ou None
+    """
+    candidates = (glob.glob(os.path.join(dados_dir, 'produtos_perdigao_*.csv')) +
+                  glob.glob(os.path.join(dados_dir, 'produtos_perdigao_*.jsonl')))
+    if exclude:
+        candidates = [path for path in candidates if os.path.abspath(path) != os.path.abspath(exclude)]
+    if not candidates:
+        return None
+    # O timestamp no nome ordena os snapshots cronologicamente
+    return max(candidates, key=os.path.basename)
+
+
+def load_snapshot(path: str) -> pd.DataFrame:
+    """Carrega um snapshot (CSV ou JSONL) mantendo todos os valores como texto"""
+    if path.endswith('.jsonl'):
+        return pd.read_json(path, lines=True, dtype=str, encoding='utf-8')
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8')
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.fillna('').astype(str)
+    return df.drop_duplicates(subset=KEY_COLUMN, keep='last')
+
+
+def compute_delta(previous: pd.DataFrame, current: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Compara dois snapshots pela URL
+
+    Args:
+        previous: Snapshot anterior
+        current: Snapshot novo
+
+    Returns:
+        Dicionário com os DataFrames 'added', 'removed', 'changed' e 'changes'
+        ('changes' tem uma linha por campo alterado: URL, CAMPO, ANTES, DEPOIS)
+    """
+    previous = _normalize(previous)
+    current = _normalize(current)
+    value_columns = [col for col in current.columns if col != KEY_COLUMN]
+    for col in value_columns:
+        if col not in previous.columns:
+            previous[col] = ''
+
+    # Hash de cada linha (vetorizado) para detectar alterações sem comparar campo a campo
+    previous = previous.assign(_hash=pd.util.hash_pandas_object(previous[value_columns], index=False).values)
+    current = current.assign(_hash=pd.util.hash_pandas_object(current[value_columns], index=False).values)
+
+    merged = previous[[KEY_COLUMN, '_hash']].merge(
+        current[[KEY_COLUMN, '_hash']], on=KEY_COLUMN, how='outer',
+        suffixes=('_old', '_new'), indicator=True
+    )
+    added_urls = merged.loc[merged['_merge'] == 'right_only', KEY_COLUMN]
+    removed_urls = merged.loc[merged['_merge'] == 'left_only', KEY_COLUMN]
+    both = merged['_merge'] == 'both'
+    changed_urls = merged.loc[both & (merged['_hash_old'] != merged['_hash_new']), KEY_COLUMN]
+
+    columns = [col for col in current.columns if col != '_hash']
+    added = current[current[KEY_COLUMN].isin(added_urls)][columns]
+    removed = previous[previous[KEY_COLUMN].isin(removed_urls)][columns]
+    changed = current[current[KEY_COLUMN].isin(changed_urls)][columns]
+
+    # Campos alterados: compara os dois lados alinhados pela URL
+    old_values = previous.set_index(KEY_COLUMN).loc[changed[KEY_COLUMN], value_columns]
+    new_values = changed.set_index(KEY_COLUMN)[value_columns]
+    changed_cells = old_values.ne(new_values).stack()
+    changed_cells = changed_cells[changed_cells].index
+    changes = pd.DataFrame({
+        KEY_COLUMN: changed_cells.get_level_values(0),
+        'CAMPO': changed_cells.get_level_values(1),
+        'ANTES': old_values.stack().loc[changed_cells].values,
+        'DEPOIS': new_values.stack().loc[changed_cells].values,
+    })
+
+    return {'added': added, 'removed': removed, 'changed': changed, 'changes': changes}
+
+
+def save_delta(delta: Dict[str, pd.DataFrame], previous_path: str, current_path: str,
+               dados_dir: str = DADOS_DIR, timestamp: Optional[str] = None) -> Dict[str, str]:
+    """
+    Salva o delta como CSV (linhas com coluna ALTERACAO) e um changelog JSON compacto
+
+    Returns:
+        Dicionário com os caminhos 'csv' e 'changelog'
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    os.makedirs(dados_dir, exist_ok=True)
+
+    frames = [frame.assign(ALTERACAO=kind) for kind, frame in
+              (('adicionado', delta['added']), ('removido', delta['removed']), ('alterado', delta['changed']))]
+    rows = pd.concat(frames, ignore_index=True)
+    rows = rows[['ALTERACAO'] + [col for col in rows.columns if col != 'ALTERACAO']]
+    csv_path = os.path.join(dados_dir, f"delta_perdigao_{timestamp}.csv")
+    rows.to_csv(csv_path, index=False, encoding='utf-8')
+
+    changes = delta['changes']
+    changelog = {
+        'anterior': os.path.basename(previous_path),
+        'atual': os.path.basename(current_path),
+        'adicionados': delta['added'][KEY_COLUMN].tolist(),
+        'removidos': delta['removed'][KEY_COLUMN].tolist(),
+        'alterados': {
+            url: {row.CAMPO: [row.ANTES, row.DEPOIS] for row in group.itertuples()}
+            for url, group in changes.groupby(KEY_COLUMN, sort=False)
+        },
+    }
+    changelog_path = os.path.join(dados_dir, f"delta_perdigao_{timestamp}_changelog.json")
+    with open(changelog_path, 'w', encoding='utf-8') as f:
+        json.dump(changelog, f, indent=2, ensure_ascii=False)
+
+    return {'csv': csv_path, 'changelog': changelog_path}
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extrator de passagem única para páginas de produto da Perdigão
+Percorre o documento uma única vez e preenche nome, porção e nutrientes,
+usando padrões pré-compilados e um mapa de rótulos pré-construído
+"""
+
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+
+# Mapeamento de campos nutricionais (rótulo da tabela -> coluna)
+NUTRICIONAL_MAPPING = {
+    'Carboidratos (g)': 'CARBOIDRATOS (g)',
+    'Proteínas (g)': 'PROTEINAS (g)',
+    'Gorduras Totais (g)': 'GORDURAS_TOTAIS (g)',
+    'Gorduras Saturadas (g)': 'GORDURAS_SATURADAS (g)',
+    'Fibra Alimentar (g)': 'FIBRAS (g)',
+    'Açúcares Totais (g)': 'ACUCARES (g)',
+    'Sódio (mg)': 'SODIO (mg)'
+}
+
+# Campos nutricionais obrigatórios e ordem das colunas de saída
+REQUIRED_FIELDS = [
+    'CALORIAS (kcal)', 'CARBOIDRATOS (g)', 'PROTEINAS (g)',
+    'GORDURAS_TOTAIS (g)', 'GORDURAS_SATURADAS (g)', 'FIBRAS (g)',
+    'ACUCARES (g)', 'SODIO (mg)'
+]
+COLUMN_ORDER = ['NOME_PRODUTO', 'URL', 'PORCAO (g)'] + REQUIRED_FIELDS
+
+# Modo direcionado: só constrói os nós usados pelos extratores
+# (h1 do nome e a tabela nutricional, que contém a célula de porção)
+TARGETED_STRAINER = SoupStrainer(['h1', 'table'])
+
+NOME_PADRAO = "Nome não encontrado"
+PORCAO_PADRAO = "100g"
+
+# Padrões pré-compilados
+CALORIAS_PATTERN = re.compile(r'^Valor Energético(\s*\(.*\))?$')
+PORCAO_PATTERN = re.compile(r'Porção\s*(\d+g)')
+CALORIAS_SEPARATOR_PATTERN = re.compile(r'[=\\/|&%#]')
+NUMBER_PATTERN = re.compile(r'([\d,\.]+)')
+
+_logger = logging.getLogger(__name__)
+
+
+def extract_product(soup: BeautifulSoup, mapping: Dict[str, str] = NUTRICIONAL_MAPPING,
+                    logger: Optional[logging.Logger] = None) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Extrai nome, porção e dados nutricionais em uma única passagem pelo documento
+
+    Equivale às buscas separadas por título (h1.product-title, senão o primeiro h1),
+    porção (td.nutricional-table-title) e linhas da primeira table.nutricional-table
+
+    Args:
+        soup: Documento da página do produto
+        mapping: Rótulo da tabela -> nome da coluna
+        logger: Logger usado para os avisos (opcional)
+
+    Returns:
+        Tupla (nome, porção, dados nutricionais brutos)
+    """
+    logger = logger or _logger
+    product_title = None
+    first_h1 = None
+    porcao = None
+    table = None
+    # Células de cada linha da tabela, por id da <tr>, na ordem do documento
+    row_cells: Dict[int, List[str]] = {}
+    rows = []
+
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        name = element.name
+
+        if name == 'h1':
+            if product_title is None and 'product-title' in (element.get('class') or ()):
+                product_title = element.get_text(strip=True)
+            elif first_h1 is None:
+                first_h1 = element.get_text(strip=True)
+
+        elif name == 'table':
+            if table is None and 'nutricional-table' in (element.get('class') or ()):
+                table = element
+
+        elif name == 'tr':
+            # Só as linhas da primeira tabela nutricional são consideradas
+            if table is not None and any(parent is table for parent in element.parents):
+                cells = []
+                rows.append(cells)
+                row_cells[id(element)] = cells
+
+        elif name == 'td':
+            classes = element.get('class') or ()
+            if 'nutricional-table-row' in classes and row_cells:
+                # Como um find_all recursivo em cada linha: a célula conta para todas
+                # as <tr> da tabela que a contêm, inclusive as de tabelas aninhadas
+                text = None
+                for parent in element.parents:
+                    if parent is table:
+                        break
+                    if parent.name == 'tr' and id(parent) in row_cells:
+                        if text is None:
+                            text = element.get_text(strip=True)
+                        row_cells[id(parent)].append(text)
+            if porcao is None and 'nutricional-table-title' in classes:
+                text = element.get_text(strip=True)
+                if 'Porção' in text:
+                    match = PORCAO_PATTERN.search(text)
+                    if match:
+                        porcao = match.group(1)
+
+    if product_title is None and first_h1 is not None:
+        # O h1 com a classe product-title pode não ser o primeiro h1 da página
+        product_title = first_h1
+
+    nutritional_data = {}
+    if table is None:
+        logger.warning("Tabela nutricional não encontrada")
+        return product_title or NOME_PADRAO, porcao or PORCAO_PADRAO, nutritional_data
+
+    for cells in rows:
+        if len(cells) >= 2:
+            nutrient_name, nutrient_value = cells[0], cells[1]
+            if CALORIAS_PATTERN.match(nutrient_name):
+                nutritional_data['CALORIAS (kcal)'] = nutrient_value
+            else:
+                field_name = mapping.get(nutrient_name)
+                if field_name:
+                    nutritional_data[field_name] = nutrient_value
+
+    if 'FIBRAS (g)' not in nutritional_data:
+        nutritional_data['FIBRAS (g)'] = '0 g'
+        logger.info("Fibra Alimentar não encontrada, definindo como 0 g")
+
+    return product_title or NOME_PADRAO, porcao or PORCAO_PADRAO, nutritional_data
+
+
+def clean_nutritional_value(value: str, field: str = "") -> str:
+    """
+    Limpa o valor nutricional removendo unidades e caracteres especiais
+    Se for calorias, pega só o número antes de qualquer símbolo separador (=, /, \\, |, &, %, #, etc.)
+
+    Args:
+        value: Valor original (ex: "236 kcal", "19 g", "500 mg", "235 = 987", "235/987")
+        field: Nome do campo (para tratamento especial de calorias)
+
+    Returns:
+        Valor limpo (ex: "236", "19", "500")
+    """
+    value = value.strip()
+    if field == 'CALORIAS (kcal)':
+        value = CALORIAS_SEPARATOR_PATTERN.split(value, 1)[0].strip()
+    match = NUMBER_PATTERN.search(value)
+    if match:
+        return match.group(1).replace(',', '.')
+    return "0"
+
+
+def build_product_row(url: str, product_name: str, porcao: str, nutritional_data: Dict[str, str],
+                      logger: Optional[logging.Logger] = None) -> Dict[str, str]:
+    """
+    Monta a linha do produto com valores limpos e todos os campos obrigatórios
+
+    Args:
+        url: URL da página do produto
+        product_name: Nome extraído
+        porcao: Porção extraída (ex: "100g")
+        nutritional_data: Valores nutricionais brutos
+
+    Returns:
+        Dicionário com os dados do produto
+    """
+    logger = logger or _logger
+    product_data = {
+        'NOME_PRODUTO': product_name,
+        'URL': url,
+        'PORCAO (g)': porcao.replace('g', ''),  # Remover 'g' da porção
+    }
+
+    # Adicionar dados nutricionais limpos
+    for field, value in nutritional_data.items():
+        product_data[field] = clean_nutritional_value(value, field)
+
+    # Garantir que todos os campos existam
+    for field in REQUIRED_FIELDS:
+        if field not in product_data:
+            product_data[field] = "0"
+            # Mesmo texto para todos os produtos (URL em extra): o logging agrega as repetições
+            logger.warning("Campo %s não encontrado, definindo como 0", field, extra={'url': url})
+
+    return product_data
+
+
+def build_raw_row(url: str, product_name: str, porcao: str, nutritional_data: Dict[str, str]) -> Dict[str, str]:
+    """
+    Monta a linha do produto com os textos brutos, sem limpeza
+
+    Usada pela limpeza em lote (cleaning.clean_nutritional_frame)
+    """
+    product_data = {'NOME_PRODUTO': product_name, 'URL': url, 'PORCAO (g)': porcao}
+    product_data.update(nutritional_data)
+    return product_data
+
+
+def parse_product_page(url: str, content: bytes, parser: str = 'html.parser',
+                       targeted: bool = True, clean: bool = True) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Faz parsing e extração completos de uma página já baixada
+
+    Função de módulo (sem estado) para poder rodar em um pool de processos:
+    recebe bytes e devolve apenas a linha do produto, nunca a árvore HTML
+
+    Args:
+        url: URL da página do produto
+        content: HTML bruto
+        parser: Backend do BeautifulSoup
+        targeted: Constrói apenas os nós usados pelos extratores
+        clean: Limpa os valores na hora; com False devolve a linha bruta (limpeza em lote)
+
+    Returns:
+        Tupla (linha do produto, segundos gastos em cada fase: parse, extract e clean)
+    """
+    inicio = time.perf_counter()
+    soup = BeautifulSoup(content, parser, parse_only=TARGETED_STRAINER if targeted else None)
+    parsed = time.perf_counter()
+    product_name, porcao, nutritional_data = extract_product(soup)
+    extracted = time.perf_counter()
+    if clean:
+        row = build_product_row(url, product_name, porcao, nutritional_data)
+    else:
+        row = build_raw_row(url, product_name, porcao, nutritional_data)
+    timings = {'parse': parsed - inicio, 'extract': extracted - parsed}
+    if clean:
+        timings['clean'] = time.perf_counter() - extracted
+    return row, timings
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Site local que imita o catálogo da Perdigão para testes de carga
+Gera N seções e páginas de produto sintéticas com a mesma marcação do site
+real (product-title, nutricional-table, nutricional-table-row) e permite
+simular latência, erros 5xx e limitação de taxa (429 com Retry-After).
+Também publica /sitemap.xml (índice) e um sitemap por seção com <lastmod>
+"""
+
+import argparse
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Seções do catálogo real (a página /produtos/ lista todas)
+SECTION_SLUGS = [
+    'empanados', 'salsichas', 'linguicas', 'frios', 'pratos-prontos', 'lanches',
+    'bacon', 'suinos', 'frango', 'food-service', 'comemorativos', 'peru',
+]
+
+# Rótulos da tabela nutricional como aparecem no site
+NUTRIENT_LABELS = [
+    ('Carboidratos (g)', 'g', 30),
+    ('Açúcares Totais (g)', 'g', 5),
+    ('Açúcares Adicionados (g)', 'g', 2),
+    ('Proteínas (g)', 'g', 25),
+    ('Gorduras Totais (g)', 'g', 20),
+    ('Gorduras Saturadas (g)', 'g', 8),
+    ('Gorduras Trans (g)', 'g', 1),
+    ('Fibra Alimentar (g)', 'g', 3),
+    ('Sódio (mg)', 'mg', 1200),
+]
+
+CATALOG_PATH = re.compile(r'^/produtos/?$')
+SECTION_PATH = re.compile(r'^/produtos/([a-z0-9-]+)/?$')
+SUBCATEGORY_PATH = re.compile(r'^/produtos/([a-z0-9-]+)/([a-z0-9-]+)/?$')
+SECTION_SITEMAP_PATH = re.compile(r'^/sitemap-([a-z0-9-]+)\.xml$')
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# As datas de <lastmod> dos produtos ficam entre esta data e um ano depois
+LASTMOD_EPOCH = date(2025, 1, 1)
+PRODUCT_PATH = re.compile(r'^/produtos/([a-z0-9-]+)/([a-z0-9-]+)/([a-z0-9-]+)/?$')
+
+# A cada NO_TABLE_EVERY produtos, um vem sem tabela nutricional (como o "Pescoço de peru")
+NO_TABLE_EVERY = 25
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Converte a descrição da distribuição de latência em um amostrador (segundos)
+
+    Args:
+        spec: 'fixed:MS', 'uniform:MIN_MS,MAX_MS', 'lognormal:MEDIANA_MS,SIGMA'
+              ou 'exp:MEDIA_MS' (ex: 'lognormal:80,0.6')
+
+    Returns:
+        Função que recebe um random.Random e devolve a latência em segundos
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'lognormal' and len(values) == 2:
+        mu = math.log(max(values[0], 0.001))
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    if kind == 'exp' and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / max(values[0], 0.001)) / 1000
+    raise ValueError(f"Distribuição de latência inválida: {spec} "
+                     "(use fixed:MS, uniform:MIN,MAX, lognormal:MEDIANA,SIGMA ou exp:MEDIA)")
+
+
+class FakeSite:
+    def __init__(self, sections: int = 12, products_per_section: int = 40, latency: str = 'fixed:0',
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1,
+                 capacity: int = 0, seed: int = 42):
+        """
+        Configura o catálogo sintético
+
+        Args:
+            sections: Número de seções (até len(SECTION_SLUGS) usam os nomes reais)
+            products_per_section: Produtos listados em cada seção
+            latency: Distribuição de latência (ver parse_latency)
+            error_rate: Fração de respostas 503
+            throttle_rate: Fração de respostas 429 com Retry-After
+            retry_after: Valor do cabeçalho Retry-After (segundos)
+            capacity: Requisições simultâneas atendidas sem fila; acima disso a latência
+                      cresce proporcionalmente e, acima do dobro, a resposta é 429 (0 = ilimitado)
+            seed: Semente para latências e falhas reproduzíveis
+        """
+        self.sections = [SECTION_SLUGS[i] if i < len(SECTION_SLUGS) else f"secao-{i}" for i in range(sections)]
+        self.products_per_section = products_per_section
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.capacity = capacity
+        self.in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.status_counts: Dict[int, int] = {}
+        self.requests = 0
+
+    def product_paths(self, section: str) -> List[str]:
+        """Caminhos relativos dos produtos de uma seção (como nos links do site)"""
+        subcategory = f"todos-os-{section}"
+        return [f"produtos/{section}/{subcategory}/{section}-produto-{i:03d}/"
+                for i in range(self.products_per_section)]
+
+    def catalog_page(self, base_url: str = '/') -> str:
+        links = ''.join(f'<a href="produtos/{section}" class="category-card">{section}</a>' for section in self.sections)
+        return ('<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+                f'<base href="{base_url}"><title>Produtos | Perdigão</title></head><body>'
+                f'<a href="receitas/">Receitas</a><a href="fale-conosco/">Fale conosco</a>'
+                f'<div class="grid">{links}</div></body></html>')
+
+    def section_page(self, section: str, base_url: str = '/', subcategory: Optional[str] = None) -> str:
+        links = [
+            # Links de navegação que o coletor filtra
+            f'<a href="produtos/{section}" class="tag"><span>{section}</span></a>',
+            f'<a href="/produtos/{section}/" class="nav">{section}</a>',
+            f'<a href="produtos/{section}/todos-os-{section}/" class="tag">todos</a>',
+            '<a href="receitas/">Receitas</a>',
+        ]
+        for path in self.product_paths(section):
+            name = path.rstrip('/').rsplit('/', 1)[-1]
+            links.append(f'<div class="product-card"><a href="{path}" title="{name}">'
+                         f'<span class="product-card-title">{name}</span></a></div>')
+        title = subcategory or section
+        return ('<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+                f'<base href="{base_url}"><title>Produtos {title} | Perdigão</title></head><body>'
+                f'<h1 class="section-title">{title}</h1><div class="grid">{"".join(links)}</div>'
+                '</body></html>')
+
+    def product_lastmod(self, path: str) -> date:
+        """Data de alteração determinística do produto (para o <lastmod> do sitemap)"""
+        seed = int(hashlib.sha1(path.encode('utf-8')).hexdigest()[:8], 16)
+        return LASTMOD_EPOCH + timedelta(days=seed % 365)
+
+    def sitemap_index(self, base_url: str) -> str:
+        entries = []
+        for section in self.sections:
+            lastmod = max((self.product_lastmod(path) for path in self.product_paths(section)), default=LASTMOD_EPOCH)
+            entries.append(f'<sitemap><loc>{base_url}sitemap-{section}.xml</loc>'
+                           f'<lastmod>{lastmod.isoformat()}</lastmod></sitemap>')
+        return (f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{SITEMAP_NS}">'
+                f'{"".join(entries)}</sitemapindex>')
+
+    def section_sitemap(self, section: str, base_url: str) -> str:
+        # A página da seção também aparece, como no site real; o coletor a descarta
+        entries = [f'<url><loc>{base_url}produtos/{section}/</loc></url>']
+        for path in self.product_paths(section):
+            entries.append(f'<url><loc>{base_url}{path}</loc>'
+                           f'<lastmod>{self.product_lastmod(path).isoformat()}</lastmod></url>')
+        return (f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_NS}">'
+                f'{"".join(entries)}</urlset>')
+
+    def product_page(self, section: str, subcategory: str, slug: str, base_url: str = '/') -> str:
+        # Valores determinísticos por produto, para comparar execuções
+        seed = int(hashlib.sha1(slug.encode('utf-8')).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        title = slug.replace('-', ' ').title()
+        header = (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><base href="{base_url}">'
+                  f'<title>{title} | Perdigão</title></head><body><div data-component="block-product-header">'
+                  f'<h1 class="product-title">{title}</h1>'
+                  f'<a href="produtos/{section}/{subcategory}/" class="tag"><span>{subcategory}</span></a></div>')
+        footer = '</body></html>'
+        if seed % NO_TABLE_EVERY == 0:
+            return header + '<div class="product-ingredients"><p class="product-text">Ingredientes: peru.</p></div>' + footer
+
+        portion = rng.choice([30, 40, 50, 80, 100])
+        calories = rng.randint(50, 400)
+        rows = [f'<tr><td class="nutricional-table-row"> Valor Energético (g) </td>'
+                f'<td class="nutricional-table-row"> {calories} kcal = {round(calories * 4.184)} kJ </td>'
+                f'<td class="nutricional-table-row"> {calories // 20} </td></tr>']
+        for label, unit, maximum in NUTRIENT_LABELS:
+            value = f"{rng.uniform(0, maximum):.1f}".replace('.', ',')
+            rows.append(f'<tr><td class="nutricional-table-row"> {label} </td>'
+                        f'<td class="nutricional-table-row"> {value} {unit} </td>'
+                        f'<td class="nutricional-table-row"> {rng.randint(0, 40)} </td></tr>')
+        table = ('<div class="product-nutricional"><h2 class="nutricional-title product-title-2">'
+                 'Informações Nutricionais</h2><table class="nutricional-table"><tbody class="nutricional-table-body">'
+                 f'<tr><td class="nutricional-table-title"> Porção {portion}g </td>'
+                 '<td class="nutricional-table-title"> Quantidade </td>'
+                 '<td class="nutricional-table-title"> %VD </td></tr>'
+                 f'{"".join(rows)}</tbody></table></div>')
+        return header + table + footer
+
+    def route(self, path: str, base_url: str = '/') -> Tuple[int, Optional[str]]:
+        """Retorna (status, html ou xml) para o caminho pedido"""
+        path = path.split('?', 1)[0]
+        if path == '/sitemap.xml':
+            return 200, self.sitemap_index(base_url)
+        match = SECTION_SITEMAP_PATH.match(path)
+        if match and match.group(1) in self.sections:
+            return 200, self.section_sitemap(match.group(1), base_url)
+        match = PRODUCT_PATH.match(path)
+        if match and match.group(1) in self.sections:
+            section, subcategory, slug = match.groups()
+            index = slug.rsplit('-', 1)[-1]
+            if subcategory == f"todos-os-{section}" and index.isdigit() and int(index) < self.products_per_section:
+                return 200, self.product_page(section, subcategory, slug, base_url)
+        match = SUBCATEGORY_PATH.match(path)
+        if match and match.group(1) in self.sections and match.group(2) == f"todos-os-{match.group(1)}":
+            return 200, self.section_page(match.group(1), base_url, subcategory=match.group(2))
+        match = SECTION_PATH.match(path)
+        if match and match.group(1) in self.sections:
+            return 200, self.section_page(match.group(1), base_url)
+        if CATALOG_PATH.match(path):
+            return 200, self.catalog_page(base_url)
+        return 404, None
+
+    def sample(self) -> Tuple[float, Optional[int]]:
+        """Sorteia a latência e uma eventual falha (429/503) da próxima resposta"""
+        with self._lock:
+            delay = self.latency(self._rng)
+            roll = self._rng.random()
+            in_flight = self.in_flight
+        if self.capacity:
+            if in_flight > 2 * self.capacity:
+                return delay, 429
+            # Fila no servidor: a latência cresce com a sobrecarga
+            delay *= max(1.0, in_flight / self.capacity)
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 503
+        return delay, None
+
+    def record(self, status: int):
+        with self._lock:
+            self.requests += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def format_stats(self) -> str:
+        """Resumo das respostas servidas"""
+        statuses = ', '.join(f"{status}: {count}" for status, count in sorted(self.status_counts.items()))
+        return f"Site local: {self.requests} respostas ({statuses or 'nenhuma'})"
+
+
+class FakeSiteHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para permitir conexões keep-alive, como no site real
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em gravações separadas: sem TCP_NODELAY o Nagle segura o
+    # corpo até o ACK atrasado do cliente (~40 ms a mais de download por página)
+    disable_nagle_algorithm = True
+    site: FakeSite = None
+
+    def do_GET(self):
+        with self.site._lock:
+            self.site.in_flight += 1
+        try:
+            self._handle()
+        finally:
+            with self.site._lock:
+                self.site.in_flight -= 1
+
+    def _handle(self):
+        delay, failure = self.site.sample()
+        if delay > 0:
+            time.sleep(delay)
+        if failure is not None:
+            headers = {'Retry-After': f"{self.site.retry_after:g}"} if failure == 429 else {}
+            self._send(failure, f"<html><body><h1>{failure}</h1></body></html>", headers)
+            return
+        base_url = f"http://{self.headers.get('Host', 'localhost')}/"
+        status, body = self.site.route(self.path, base_url)
+        if status == 200 and self.path.split('?', 1)[0].endswith('.xml'):
+            self._send(status, body, content_type='application/xml; charset=utf-8')
+            return
+        self._send(status, body or "<html><body><h1>Página não encontrada</h1></body></html>")
+
+    def _send(self, status: int, body: str, headers: Optional[Dict[str, str]] = None,
+              content_type: str = 'text/html; charset=utf-8'):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.site.record(status)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição: o volume atrapalharia o teste de carga
+        pass
+
+
+def start_server(site: FakeSite, host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Sobe o site local em uma thread de fundo
+
+    Args:
+        site: Catálogo sintético
+        host: Endereço de escuta
+        port: Porta (0 = porta livre escolhida pelo sistema)
+
+    Returns:
+        Tupla (servidor, URL base como 'http://127.0.0.1:PORTA/')
+    """
+    handler = type('Handler', (FakeSiteHandler,), {'site': site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='fake-site', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    """Opções de configuração do site local (compartilhadas com load_test.py)"""
+    parser.add_argument('--sections', type=int, default=12,
+                        help="Número de seções (padrão: 12)")
+    parser.add_argument('--products', type=int, default=40,
+                        help="Produtos por seção (padrão: 40)")
+    parser.add_argument('--latency', default='lognormal:80,0.6',
+                        help="Latência: fixed:MS, uniform:MIN,MAX, lognormal:MEDIANA,SIGMA ou exp:MEDIA "
+                             "(padrão: lognormal:80,0.6)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fração de respostas 503 (padrão: 0)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help="Fração de respostas 429 com Retry-After (padrão: 0)")
+    parser.add_argument('--retry-after', type=float, default=1,
+                        help="Valor do Retry-After nas respostas 429 (padrão: 1)")
+    parser.add_argument('--capacity', type=int, default=0,
+                        help="Requisições simultâneas sem fila; acima disso a latência cresce e acima do dobro "
+                             "vem 429 (padrão: 0 = ilimitado)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Semente das latências e falhas (padrão: 42)")
+
+
+def site_from_args(args) -> FakeSite:
+    return FakeSite(sections=args.sections, products_per_section=args.products, latency=args.latency,
+                    error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                    retry_after=args.retry_after, capacity=args.capacity, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Site local que imita o catálogo da Perdigão")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="Porta (padrão: 8000)")
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    site = site_from_args(args)
+    server, base_url = start_server(site, args.host, args.port)
+    print(f"🌐 Site local em {base_url} ({len(site.sections)} seções x {site.products_per_section} produtos)")
+    print(f"   Use PERDIGAO_BASE_URL={base_url} para apontar o coletor para ele")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n{site.format_stats()}")
+        server.shutdown()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arquivo comprimido de HTML bruto (append-only) com índice de offsets
+Cada resposta é gravada como um membro gzip independente no arquivo de
+dados, e o índice (JSON lines) guarda URL, offset e tamanho de cada
+registro, permitindo leitura aleatória via mmap e replay offline
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'archive')
+
+
+class HTMLArchive:
+    def __init__(self, archive_dir: str = DEFAULT_ARCHIVE_DIR, name: str = 'paginas', compresslevel: int = 6):
+        """
+        Abre (ou cria) o arquivo de páginas
+
+        Args:
+            archive_dir: Pasta do arquivo
+            name: Prefixo dos arquivos de dados (.bin) e índice (.idx.jsonl)
+            compresslevel: Nível de compressão gzip (1-9)
+        """
+        os.makedirs(archive_dir, exist_ok=True)
+        self.data_path = os.path.join(archive_dir, f"{name}.bin")
+        self.index_path = os.path.join(archive_dir, f"{name}.idx.jsonl")
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._mmap_file = None
+        # Último registro de cada URL (o mais recente prevalece)
+        self.index: Dict[str, Dict] = {}
+        self._load_index()
+
+    def _load_index(self):
+        """Carrega o índice, ignorando registros truncados ou fora do arquivo de dados"""
+        if not os.path.exists(self.index_path):
+            return
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record['offset'] + record['length'] <= data_size:
+                    self.index[record['url']] = record
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.index
+
+    def urls(self, order: Optional[List[str]] = None) -> List[str]:
+        """
+        URLs arquivadas
+
+        Args:
+            order: Ordem preferida (ex: o product_urls.json); as URLs arquivadas que
+                   não estão nela vêm depois, na ordem em que foram gravadas pela
+                   última vez (a ordem de término dos downloads, não a do catálogo)
+        """
+        archived = [record['url'] for record in sorted(self.index.values(), key=lambda r: r['offset'])]
+        if not order:
+            return archived
+        listed = list(dict.fromkeys(url for url in order if url in self.index))
+        listed_set = set(listed)
+        return listed + [url for url in archived if url not in listed_set]
+
+    def append(self, url: str, content: bytes, status_code: int = 200, content_type: str = '') -> bool:
+        """
+        Grava uma resposta no arquivo
+
+        Args:
+            url: URL da página
+            content: Corpo bruto da resposta
+            status_code: Status HTTP
+            content_type: Content-Type da resposta
+
+        Returns:
+            True se gravou, False se o corpo é idêntico ao último registro da URL
+        """
+        digest = hashlib.sha1(content).hexdigest()
+        compressed = gzip.compress(content, compresslevel=self.compresslevel)
+        with self._lock:
+            previous = self.index.get(url)
+            if previous and previous.get('sha1') == digest:
+                return False
+            with open(self.data_path, 'ab') as f:
+                offset = f.tell()
+                f.write(compressed)
+            record = {
+                'url': url,
+                'offset': offset,
+                'length': len(compressed),
+                'size': len(content),
+                'sha1': digest,
+                'status': status_code,
+                'content_type': content_type,
+                'fetched_at': time.time(),
+            }
+            # O índice só é escrito depois dos dados: um registro indexado está sempre completo
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.index[url] = record
+            return True
+
+    def _view(self, end: int) -> mmap.mmap:
+        """Retorna um mmap do arquivo de dados cobrindo pelo menos até `end`"""
+        if self._mmap is None or len(self._mmap) < end:
+            self.close()
+            self._mmap_file = open(self.data_path, 'rb')
+            self._mmap = mmap.mmap(self._mmap_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def read(self, url: str) -> Optional[bytes]:
+        """Lê (descomprimido) o registro mais recente da URL, ou None"""
+        record = self.index.get(url)
+        if not record:
+            return None
+        start = record['offset']
+        end = start + record['length']
+        with self._lock:
+            compressed = self._view(end)[start:end]
+        return gzip.decompress(compressed)
+
+    def iter_pages(self) -> Iterator[Tuple[str, bytes]]:
+        """Itera (url, html) por todas as páginas arquivadas"""
+        for url in self.urls():
+            content = self.read(url)
+            if content is not None:
+                yield url, content
+
+    def close(self):
+        """Fecha o mmap aberto para leitura"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._mmap_file is not None:
+            self._mmap_file.close()
+            self._mmap_file = None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache HTTP em disco com GET condicional (ETag / Last-Modified)
+Guarda corpo e validadores de cada URL e revalida com If-None-Match /
+If-Modified-Since, servindo o corpo do cache quando o servidor responde 304.
+Os metadados levam o hash do corpo e são gravados por último: um corpo que
+não confere com os metadados (gravação interrompida ou concorrente) é
+tratado como ausente
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'cache', 'http')
+
+
+class CacheResult:
+    """Resultado de uma busca via cache"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], from_cache: bool):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+
+class HTTPCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: Optional[float] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            cache_dir: Pasta onde ficam os corpos e metadados
+            ttl: Validade (segundos) para páginas sem ETag/Last-Modified;
+                 sem TTL essas páginas são sempre baixadas novamente
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = {'revalidated': 0, 'fresh': 0, 'misses': 0, 'bytes_saved': 0}
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _count(self, field: str, amount: int = 1):
+        with self._lock:
+            self.stats[field] += amount
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Lê a entrada do cache para a URL (metadados + corpo), ou None se ausente ou inconsistente"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                meta['content'] = f.read()
+        except (OSError, ValueError):
+            return None
+        # Corpo de outra resposta (ou de uma entrada sem hash, de versões anteriores): não serve
+        if meta.get('sha256') != hashlib.sha256(meta['content']).hexdigest():
+            return None
+        return meta
+
+    def store(self, url: str, content: bytes, headers: Dict[str, str]):
+        """
+        Grava corpo e validadores
+
+        Cada arquivo é substituído atomicamente e os metadados, com o hash do corpo,
+        vão por último: load só aceita o par se o hash conferir
+        """
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'sha256': hashlib.sha256(content).hexdigest(),
+            'stored_at': time.time(),
+        }
+        for path, data, mode in ((body_path, content, 'wb'), (meta_path, meta, 'w')):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            if mode == 'wb':
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    def _touch(self, url: str, entry: Dict):
+        """Renova o instante de armazenamento após uma revalidação"""
+        meta_path, _ = self._paths(url)
+        entry = {k: v for k, v in entry.items() if k != 'content'}
+        entry['stored_at'] = time.time()
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+
+    def fetch(self, session: requests.Session, url: str, timeout: float = 10, **kwargs) -> CacheResult:
+        """
+        Busca a URL usando o cache
+
+        Args:
+            session: Sessão HTTP usada para a requisição
+            url: URL da página
+            timeout: Timeout da requisição em segundos
+
+        Returns:
+            CacheResult com o corpo (do servidor ou do cache)
+
+        Raises:
+            requests.HTTPError: Se o servidor responder com erro
+        """
+        entry = self.load(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+
+        if entry:
+            has_validators = entry.get('etag') or entry.get('last_modified')
+            age = time.time() - entry.get('stored_at', 0)
+            if not has_validators and self.ttl is not None and age < self.ttl:
+                self._count('fresh')
+                self._count('bytes_saved', len(entry['content']))
+                return CacheResult(url, 200, entry['content'],
+                                   CaseInsensitiveDict({'Content-Type': entry.get('content_type') or ''}), True)
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, timeout=timeout, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self._count('revalidated')
+            self._count('bytes_saved', len(entry['content']))
+            self._touch(url, entry)
+            # O 304 costuma vir sem Content-Type: vale o do corpo guardado
+            result_headers = CaseInsensitiveDict(response.headers)
+            if entry.get('content_type'):
+                result_headers['Content-Type'] = entry['content_type']
+            return CacheResult(url, 200, entry['content'], result_headers, True)
+
+        response.raise_for_status()
+        self._count('misses')
+        if response.headers.get('ETag') or response.headers.get('Last-Modified') or self.ttl is not None:
+            self.store(url, response.content, response.headers)
+        return CacheResult(url, response.status_code, response.content, CaseInsensitiveDict(response.headers), False)
+
+    def format_stats(self) -> str:
+        """Formata as estatísticas do cache em uma linha legível"""
+        with self._lock:
+            stats = dict(self.stats)
+        return (f"Cache HTTP - 304: {stats['revalidated']} | "
+                f"TTL: {stats['fresh']} | "
+                f"Downloads: {stats['misses']} | "
+                f"Economizado: {stats['bytes_saved'] / 1024:.1f} KB")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP compartilhado entre o coletor de URLs e o scraper
+Mantém uma única sessão com pool de conexões keep-alive, retoma a sessão
+TLS nas conexões novas com um host já visitado e registra estatísticas de
+conexões novas versus reutilizadas
+"""
+
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.ssl_ import create_urllib3_context
+
+
+# Headers para simular navegador (usados por todos os módulos)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Tamanho do pool: hosts distintos mantidos e conexões abertas por host
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 16
+
+
+class ConnectionStats:
+    """Contadores thread-safe de requisições e handshakes TCP/TLS"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera os contadores"""
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.tls_resumed = 0
+            self.connect_time = 0.0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self, elapsed: float):
+        with self._lock:
+            self.new_connections += 1
+            self.connect_time += elapsed
+
+    def record_tls_resumed(self):
+        with self._lock:
+            self.tls_resumed += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Retorna um resumo das estatísticas
+
+        Returns:
+            Dicionário com requisições, conexões novas/reutilizadas e tempo de handshake
+        """
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            avg_connect = self.connect_time / self.new_connections if self.new_connections else 0.0
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': reused,
+                # Conexões novas com handshake TLS abreviado (sessão retomada)
+                'tls_resumed': self.tls_resumed,
+                'connect_time_s': round(self.connect_time, 4),
+                'avg_connect_time_s': round(avg_connect, 4),
+                # Tempo de handshake economizado pelas conexões reaproveitadas
+                'handshake_time_saved_s': round(reused * avg_connect, 4),
+            }
+
+
+connection_stats = ConnectionStats()
+
+# Medição de tempo da requisição em andamento na thread (ver track_timing)
+_timing = threading.local()
+
+
+def _add_timing(field: str, seconds: float):
+    timing = getattr(_timing, 'current', None)
+    if timing is not None:
+        timing[field] = timing.get(field, 0.0) + seconds
+
+
+@contextmanager
+def track_timing(timing: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, float]]:
+    """
+    Mede as requisições feitas pela thread atual dentro do bloco
+
+    Acumula em `timing` (várias tentativas somam): connect_s (handshakes TCP/TLS),
+    headers_s (envio até o fim dos cabeçalhos, incluindo o handshake) e total_s
+    (bloco inteiro, incluindo a leitura do corpo)
+
+    Uso:
+        with track_timing() as timing:
+            response = get(url)
+    """
+    timing = {} if timing is None else timing
+    previous = getattr(_timing, 'current', None)
+    _timing.current = timing
+    inicio = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing['total_s'] = timing.get('total_s', 0.0) + time.perf_counter() - inicio
+        _timing.current = previous
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        inicio = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - inicio
+        connection_stats.record_connect(elapsed)
+        _add_timing('connect_s', elapsed)
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # Inclui o handshake TLS
+        inicio = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - inicio
+        connection_stats.record_connect(elapsed)
+        _add_timing('connect_s', elapsed)
+
+    def getresponse(self, *args, **kwargs):
+        sock = self.sock
+        response = super().getresponse(*args, **kwargs)
+        # Com os cabeçalhos lidos o ticket do TLS 1.3 já chegou; o socket é guardado antes
+        # porque uma resposta com "Connection: close" já desliga a conexão aqui
+        if isinstance(sock, ssl.SSLSocket) and isinstance(sock.context, ResumingSSLContext):
+            sock.context.save_session(sock)
+        return response
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    SSLContext que retoma, em cada conexão nova, a última sessão TLS do mesmo host
+
+    O urllib3 cria cada conexão sem sessão (handshake completo, com certificados);
+    aqui a sessão guardada vai para o wrap_socket e o servidor pode aceitar o
+    handshake abreviado. No TLS 1.3 o ticket só chega depois do handshake, então a
+    sessão é guardada de novo a cada resposta (ver _CountingHTTPSConnection)
+    """
+
+    def __new__(cls, *args, **kwargs):
+        context = super().__new__(cls, *args, **kwargs)
+        context._sessions = {}
+        context._sessions_lock = threading.Lock()
+        return context
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None and server_hostname:
+            with self._sessions_lock:
+                session = self._sessions.get(server_hostname)
+        ssl_sock = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        if ssl_sock.session_reused:
+            connection_stats.record_tls_resumed()
+        self.save_session(ssl_sock)
+        return ssl_sock
+
+    def save_session(self, ssl_sock: ssl.SSLSocket):
+        """Guarda a sessão da conexão para o próximo handshake com o mesmo host, se já for retomável"""
+        session = ssl_sock.session
+        if session is None or not ssl_sock.server_hostname:
+            return
+        if ssl_sock.version() == 'TLSv1.3' and not session.has_ticket:
+            return
+        with self._sessions_lock:
+            self._sessions[ssl_sock.server_hostname] = session
+
+
+def create_ssl_context() -> ResumingSSLContext:
+    """Contexto TLS com as opções padrão do urllib3, mas com tickets de sessão e retomada"""
+    defaults = create_urllib3_context()
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    # O urllib3 desliga os tickets do TLS 1.2 (OP_NO_TICKET); sem eles só o ID de sessão é retomável
+    context.options = defaults.options & ~ssl.OP_NO_TICKET
+    context.minimum_version = defaults.minimum_version
+    context.verify_mode = ssl.CERT_REQUIRED
+    context.check_hostname = True
+    return context
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter com pool dimensionado, contagem de conexões e um contexto TLS compartilhado"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        # Um contexto só para todas as conexões: é nele que ficam as sessões TLS para retomar
+        kwargs.setdefault('ssl_context', create_ssl_context())
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _count_request(response, *args, **kwargs):
+    connection_stats.record_request()
+    # elapsed vai do envio até o fim dos cabeçalhos (o corpo ainda não foi lido)
+    _add_timing('headers_s', response.elapsed.total_seconds())
+
+
+def create_session() -> requests.Session:
+    """Cria uma sessão com pool de conexões keep-alive, retomada de sessão TLS e headers de navegador"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = PooledHTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(_count_request)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Retorna a sessão HTTP compartilhada (criada sob demanda)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get(url: str, timeout: float = 10, **kwargs) -> requests.Response:
+    """
+    Faz um GET usando a sessão compartilhada
+
+    Args:
+        url: URL a ser acessada
+        timeout: Timeout da requisição em segundos
+
+    Returns:
+        Objeto Response do requests
+    """
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def get_connection_stats() -> Dict[str, float]:
+    """Retorna as estatísticas de conexões da sessão compartilhada"""
+    return connection_stats.snapshot()
+
+
+def format_connection_stats() -> str:
+    """Formata as estatísticas de conexões em uma linha legível"""
+    stats = get_connection_stats()
+    return (f"Requisições: {stats['requests']} | "
+            f"Conexões novas: {stats['new_connections']} | "
+            f"Reutilizadas: {stats['reused_connections']} | "
+            f"TLS retomadas: {stats['tls_resumed']} | "
+            f"Handshake economizado: {stats['handshake_time_saved_s']:.2f}s")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de carga de ponta a ponta contra o site local (fake_site.py)
+Sobe o site sintético, executa a coleta de URLs e o scraping apontados para
+ele e relata páginas por segundo e latência de cauda (p50/p95/p99) de cada etapa
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import threading
+import time
+from typing import Dict, List
+
+import http_client
+import url_collector
+import log_setup
+from fake_site import add_site_arguments, site_from_args, start_server
+from metrics import percentile
+from rate_control import get_shared_limiter
+from scraper import PerdigaoScraper
+
+
+class ResponseRecorder:
+    """Registra latência e status de cada resposta da sessão compartilhada, por etapa"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage = None
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+
+    def __call__(self, response, *args, **kwargs):
+        # Hook 'response' do requests: elapsed vai do envio até o fim dos cabeçalhos
+        with self._lock:
+            self.latencies.setdefault(self.stage, []).append(response.elapsed.total_seconds())
+            statuses = self.statuses.setdefault(self.stage, {})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return response
+
+    def summary(self, stage: str, elapsed: float, items: int) -> Dict:
+        latencies = sorted(self.latencies.get(stage, []))
+        return {
+            'requests': len(latencies),
+            'items': items,
+            'seconds': round(elapsed, 3),
+            'pages_per_second': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            'status': {str(status): count for status, count in sorted(self.statuses.get(stage, {}).items())},
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50) * 1000, 1),
+                'p95': round(percentile(latencies, 0.95) * 1000, 1),
+                'p99': round(percentile(latencies, 0.99) * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            },
+        }
+
+
+def print_stage(name: str, summary: Dict):
+    latency = summary['latency_ms']
+    statuses = ', '.join(f"{status}: {count}" for status, count in summary['status'].items())
+    print(f"\n📈 {name}")
+    print(f"   Requisições: {summary['requests']} ({statuses or 'nenhuma'}) em {summary['seconds']:.2f}s")
+    print(f"   Vazão: {summary['pages_per_second']:.1f} páginas/s | itens obtidos: {summary['items']}")
+    print(f"   Latência: p50 {latency['p50']:.0f} ms | p95 {latency['p95']:.0f} ms | "
+          f"p99 {latency['p99']:.0f} ms | máx {latency['max']:.0f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga de ponta a ponta contra o site local")
+    add_site_arguments(parser)
+    parser.add_argument('--workers', type=int, default=8,
+                        help="Requisições de produto em paralelo (padrão: 8)")
+    parser.add_argument('--max-per-host', type=int, default=8,
+                        help="Máximo de requisições simultâneas por host (padrão: 8)")
+    parser.add_argument('--rate', type=float, default=url_collector.SECTION_RATE,
+                        help=f"Orçamento do coletor em requisições/s (padrão: {url_collector.SECTION_RATE:g}; 0 = sem limite)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Usa o controlador adaptativo de concorrência (até --workers)")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Processos de parsing (0 = parsing na thread do download)")
+    parser.add_argument('--fused', action='store_true',
+                        help="Coleta e scraping em uma única etapa: cada produto descoberto vai direto ao scraper")
+    parser.add_argument('--output', default=None,
+                        help="Grava o relatório em JSON neste arquivo")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Mostra a saída do coletor e os logs do scraper")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    if not args.verbose:
+        # Configurado antes do scraper: só erros no terminal e nenhum arquivo de log
+        log_setup.setup_logging(level=logging.ERROR, log_path=None)
+
+    site = site_from_args(args)
+    server, base_url = start_server(site)
+    print(f"🌐 Site local em {base_url} ({len(site.sections)} seções x {site.products_per_section} produtos, "
+          f"latência {args.latency}, erros {args.error_rate:.0%}, 429 {args.throttle_rate:.0%})")
+
+    limiter = get_shared_limiter(max_limit=args.workers) if args.adaptive else None
+    recorder = ResponseRecorder()
+    http_client.get_session().hooks['response'].append(recorder)
+    report = {'site': vars(args), 'stages': {}}
+
+    try:
+        max_per_host = args.workers if args.adaptive else args.max_per_host
+        scraper = PerdigaoScraper(max_workers=args.workers, max_per_host=max_per_host,
+                                  parse_workers=args.parse_workers, limiter=limiter)
+        output = io.StringIO() if not args.verbose else None
+
+        if args.fused:
+            # Etapa única: coleta e scraping sobrepostos
+            recorder.stage = 'fundido'
+            print("\n🔀 Coletando URLs e extraindo produtos ao mesmo tempo...")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                urls = url_collector.iter_product_urls(base_url=base_url, rate=args.rate, limiter=limiter)
+                df = scraper.scrape_products(urls)
+            rows = 0 if df is None else len(df)
+            report['stages']['fundido'] = recorder.summary('fundido', time.perf_counter() - start, rows)
+            print_stage("Coleta + scraping (fundido)", report['stages']['fundido'])
+        else:
+            # Etapa 1: coleta de URLs
+            recorder.stage = 'coleta'
+            print("\n🔍 Coletando URLs...")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                urls = url_collector.collect_all_product_urls(base_url=base_url, rate=args.rate, limiter=limiter)
+                urls = url_collector.filter_product_urls(urls, base_url=base_url)
+            report['stages']['coleta'] = recorder.summary('coleta', time.perf_counter() - start, len(urls))
+            print_stage("Coleta de URLs", report['stages']['coleta'])
+
+            # Etapa 2: scraping dos produtos
+            recorder.stage = 'scraping'
+            print(f"\n📊 Extraindo {len(urls)} produtos...")
+            start = time.perf_counter()
+            df = scraper.scrape_products(urls)
+            rows = 0 if df is None else len(df)
+            report['stages']['scraping'] = recorder.summary('scraping', time.perf_counter() - start, rows)
+            print_stage("Scraping de produtos", report['stages']['scraping'])
+    finally:
+        http_client.get_session().hooks['response'].remove(recorder)
+        server.shutdown()
+
+    print(f"\n🌐 {site.format_stats()}")
+    if limiter is not None:
+        print(f"🎛️  {limiter.format_stats()}")
+        report['limiter'] = limiter.snapshot()
+    report['site_status'] = {str(status): count for status, count in sorted(site.status_counts.items())}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em: {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging assíncrono e estruturado do scraper
+As threads de trabalho só enfileiram cada registro (QueueHandler); uma
+thread em segundo plano (QueueListener) formata e grava no terminal e no
+arquivo de log, em JSON lines, com um arquivo novo a cada execução.
+Mensagens repetidas (ex: "Campo ... não encontrado") são gravadas uma vez
+e resumidas com a contagem no fim da execução
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'logs')
+LOG_PATH = os.path.join(LOGS_DIR, 'scraper_perdigao.jsonl')
+
+# Formato do terminal (o arquivo usa JSONFormatter)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Logs de execuções anteriores mantidos (scraper_perdigao.jsonl.1, .2, ...)
+BACKUP_COUNT = 10
+
+# Ocorrências de uma mesma mensagem gravadas antes de passar a só contar
+REPEAT_LIMIT = 1
+
+# URLs de exemplo guardadas por mensagem repetida
+SAMPLE_URLS = 3
+
+# Atributos padrão do LogRecord; o resto veio de extra={...} e vai para o JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Um objeto JSON por linha: horário, nível, logger, thread, mensagem e os campos de extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RepeatAggregator(logging.Filter):
+    """
+    Filtro que deixa passar as primeiras `limit` ocorrências de cada mensagem
+    (INFO e WARNING) e só conta as demais; ERROR e acima passam sempre
+    """
+
+    def __init__(self, limit: int = REPEAT_LIMIT):
+        super().__init__()
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple, List] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not logging.INFO <= record.levelno < logging.ERROR:
+            return True
+        # O modelo e os argumentos identificam a mensagem; a URL (extra) não entra na chave
+        key = (record.name, record.levelno, str(record.msg), repr(record.args))
+        url = getattr(record, 'url', None)
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None:
+                entry = self._counts[key] = [0, record.getMessage(), []]
+            entry[0] += 1
+            if url and len(entry[2]) < SAMPLE_URLS:
+                entry[2].append(url)
+            return entry[0] <= self.limit
+
+    def drain(self) -> List[Tuple[int, str, int, List[str]]]:
+        """Mensagens que passaram do limite, como (nível, mensagem, ocorrências, URLs de exemplo); zera as contagens"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return [(key[1], message, count, urls)
+                for key, (count, message, urls) in counts.items() if count > self.limit]
+
+
+_listener: Optional[QueueListener] = None
+_aggregator: Optional[RepeatAggregator] = None
+_file_handler: Optional[RotatingFileHandler] = None
+
+
+def setup_logging(level: Union[str, int, None] = None, console: bool = True,
+                  log_path: Optional[str] = LOG_PATH, backups: int = BACKUP_COUNT,
+                  repeat_limit: int = REPEAT_LIMIT) -> bool:
+    """
+    Configura o logging assíncrono no logger raiz
+
+    Como o basicConfig, não mexe em um logging já configurado por outro código;
+    chamadas seguintes só ajustam o nível (quando informado)
+
+    Args:
+        level: Nível mínimo ('DEBUG', 'INFO', 'WARNING', 'ERROR'; padrão INFO)
+        console: Mostra os logs no terminal (stderr), em texto
+        log_path: Arquivo de log em JSON lines (None = sem arquivo)
+        backups: Logs de execuções anteriores mantidos pela rotação
+        repeat_limit: Ocorrências de cada mensagem repetida gravadas antes do resumo
+
+    Returns:
+        True se o logging foi configurado nesta chamada
+    """
+    global _listener, _aggregator, _file_handler
+    root = logging.getLogger()
+    if _listener is not None or root.handlers:
+        if level is not None:
+            root.setLevel(level)
+        return False
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(stream)
+    if log_path:
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        _file_handler = RotatingFileHandler(log_path, backupCount=backups, encoding='utf-8', delay=True)
+        _file_handler.setFormatter(JSONFormatter())
+        handlers.append(_file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _aggregator = RepeatAggregator(repeat_limit)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(_aggregator)
+    root.handlers = [queue_handler]
+    root.setLevel(level if level is not None else logging.INFO)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return True
+
+
+def start_run():
+    """Começa o log de uma nova execução: o arquivo atual vira scraper_perdigao.jsonl.1 e as contagens zeram"""
+    if _aggregator is not None:
+        _aggregator.drain()
+    if _file_handler is None:
+        return
+    with _file_handler.lock:
+        path = _file_handler.baseFilename
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _file_handler.doRollover()
+
+
+def log_repeat_summary(logger: logging.Logger):
+    """Registra uma linha por mensagem repetida, com o total de ocorrências, e zera as contagens"""
+    if _aggregator is None:
+        return
+    for level, message, count, urls in _aggregator.drain():
+        logger.log(level, "Repetida %d vezes (%d no log): %s", count, _aggregator.limit, message,
+                   extra={'repeated': count, 'sample_urls': urls})
+
+
+def shutdown_logging():
+    """Grava os registros ainda na fila e para a thread do logging"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class _Forwarder:
+    """Repassa registros vindos de outros processos aos loggers deste processo"""
+
+    def handle(self, record: logging.LogRecord):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def init_worker_logging(log_queue, level: int):
+    """Initializer de processos de trabalho: todo registro vai para a fila do processo principal"""
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+@contextmanager
+def process_log_queue(context=None) -> Iterator:
+    """
+    Fila para os logs de um pool de processos (ver init_worker_logging), repassados
+    ao logging deste processo enquanto o bloco estiver aberto
+
+    Args:
+        context: Contexto do multiprocessing do pool (a fila precisa ser do mesmo
+                 método de início dos processos; None = o padrão)
+
+    Ex: with process_log_queue(context) as log_queue:
+            ProcessPoolExecutor(mp_context=context, initializer=init_worker_logging,
+                                initargs=(log_queue, logging.getLogger().level))
+    """
+    log_queue = (context or multiprocessing).Queue()
+    listener = QueueListener(log_queue, _Forwarder())
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas de desempenho por URL do coletor e do scraper
+Registra o tempo de cada fase (conexão, primeiro byte, download, parsing,
+extração e limpeza) e os bytes transferidos, agrega em percentis
+(p50/p95/p99) e exporta um relatório JSON por execução e um arquivo no
+formato texto do Prometheus (node_exporter --collector.textfile)
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+METRICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'metrics')
+
+# Fases na ordem em que acontecem para cada URL
+PHASES = ('connect', 'ttfb', 'download', 'parse', 'extract', 'clean')
+
+PHASE_LABELS = {
+    'connect': 'conexão',
+    'ttfb': 'primeiro byte',
+    'download': 'download',
+    'parse': 'parsing',
+    'extract': 'extração',
+    'clean': 'limpeza',
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# URLs mais lentas listadas no relatório JSON
+SLOWEST_URLS = 20
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def network_phases(timing: Dict[str, float]) -> Dict[str, float]:
+    """
+    Separa o tempo de rede medido por http_client.track_timing em fases
+
+    Returns:
+        {'connect', 'ttfb', 'download'}: handshake TCP/TLS, envio até os cabeçalhos
+        (sem o handshake) e leitura do corpo
+    """
+    connect = timing.get('connect_s', 0.0)
+    headers = timing.get('headers_s', 0.0)
+    total = timing.get('total_s', 0.0)
+    return {
+        'connect': connect,
+        'ttfb': max(0.0, headers - connect),
+        'download': max(0.0, total - headers),
+    }
+
+
+class RunMetrics:
+    """Tempos por fase de cada URL de uma execução, thread-safe"""
+
+    def __init__(self, stage: str):
+        """
+        Args:
+            stage: Nome da etapa nos relatórios e nas métricas ('scraper' ou 'coletor')
+        """
+        self.stage = stage
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self.per_url: Dict[str, Dict[str, float]] = {}
+        self.bytes = 0
+
+    def record(self, url: str, phase: str, seconds: float):
+        """Soma `seconds` à fase da URL (várias chamadas na mesma fase se acumulam)"""
+        with self._lock:
+            phases = self.per_url.setdefault(url, {})
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def record_network(self, url: str, timing: Dict[str, float], size: int):
+        """Registra as fases de rede (ver network_phases) e os bytes recebidos de uma URL"""
+        for phase, seconds in network_phases(timing).items():
+            self.record(url, phase, seconds)
+        with self._lock:
+            self.bytes += size
+
+    def record_batch(self, phase: str, seconds: float, count: int):
+        """Registra uma fase feita em lote (ex: limpeza vetorizada), dividida igualmente entre as linhas"""
+        if count <= 0:
+            return
+        with self._lock:
+            self.samples[phase].extend([seconds / count] * count)
+
+    def _phase_values(self) -> Dict[str, List[float]]:
+        with self._lock:
+            values = {phase: list(samples) for phase, samples in self.samples.items()}
+            for phases in self.per_url.values():
+                for phase, seconds in phases.items():
+                    values[phase].append(seconds)
+        return {phase: sorted(samples) for phase, samples in values.items()}
+
+    def summary(self) -> Dict:
+        """Agregado da execução: percentis por fase, bytes e duração"""
+        phases = {}
+        for phase, values in self._phase_values().items():
+            phases[phase] = {
+                'count': len(values),
+                'sum_s': round(sum(values), 6),
+                'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2) if values else 0.0,
+            }
+        with self._lock:
+            urls = len(self.per_url)
+            total_bytes = self.bytes
+            slowest = sorted(self.per_url.items(), key=lambda item: sum(item[1].values()), reverse=True)
+            slowest = [{'url': url, 'total_ms': round(sum(values.values()) * 1000, 2),
+                        **{f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in values.items()}}
+                       for url, values in slowest[:SLOWEST_URLS]]
+        return {
+            'stage': self.stage,
+            'started_at': self.started_at,
+            'duration_s': round(time.perf_counter() - self._start, 3),
+            'urls': urls,
+            'bytes': total_bytes,
+            'phases': phases,
+            'slowest_urls': slowest,
+        }
+
+    def format_stats(self) -> str:
+        """Percentis por fase em uma linha legível"""
+        summary = self.summary()
+        parts = [f"{PHASE_LABELS[phase]} p50 {stats['p50_ms']:.1f}/p95 {stats['p95_ms']:.1f}/"
+                 f"p99 {stats['p99_ms']:.1f} ms"
+                 for phase, stats in summary['phases'].items() if stats['count']]
+        return (f"Tempos por URL ({summary['urls']} URLs, {summary['bytes'] / 1024:.0f} KB): "
+                + (" | ".join(parts) or "nenhum registro"))
+
+    def to_prometheus(self, summary: Optional[Dict] = None) -> str:
+        """Formato texto do Prometheus: um summary por fase e medidas da execução"""
+        summary = summary or self.summary()
+        prefix = 'perdigao'
+        stage = self.stage
+        lines = [
+            f"# HELP {prefix}_phase_seconds Duração de cada fase por URL na última execução",
+            f"# TYPE {prefix}_phase_seconds summary",
+        ]
+        for phase, stats in summary['phases'].items():
+            labels = f'stage="{stage}",phase="{phase}"'
+            for quantile in QUANTILES:
+                value = stats[f"p{int(quantile * 100)}_ms"] / 1000
+                lines.append(f'{prefix}_phase_seconds{{{labels},quantile="{quantile:g}"}} {value:.6f}')
+            lines.append(f"{prefix}_phase_seconds_sum{{{labels}}} {stats['sum_s']:.6f}")
+            lines.append(f"{prefix}_phase_seconds_count{{{labels}}} {stats['count']}")
+        lines += [
+            f"# HELP {prefix}_bytes Bytes recebidos na última execução",
+            f"# TYPE {prefix}_bytes gauge",
+            f'{prefix}_bytes{{stage="{stage}"}} {summary["bytes"]}',
+            f"# HELP {prefix}_urls URLs processadas na última execução",
+            f"# TYPE {prefix}_urls gauge",
+            f'{prefix}_urls{{stage="{stage}"}} {summary["urls"]}',
+            f"# HELP {prefix}_run_duration_seconds Duração da última execução",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f'{prefix}_run_duration_seconds{{stage="{stage}"}} {summary["duration_s"]}',
+            f"# HELP {prefix}_last_run_timestamp_seconds Início da última execução (epoch)",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f'{prefix}_last_run_timestamp_seconds{{stage="{stage}"}} {summary["started_at"]:.0f}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, run_id: str, directory: str = METRICS_DIR) -> Dict[str, str]:
+        """
+        Grava o relatório JSON da execução e o arquivo do Prometheus
+
+        O JSON é um por execução ({etapa}_{run_id}.json); o .prom tem nome fixo
+        por etapa e é substituído de forma atômica, como o textfile collector espera
+
+        Args:
+            run_id: Identificador da execução (ex: o timestamp do CSV)
+            directory: Pasta de saída
+
+        Returns:
+            {'json': caminho, 'prometheus': caminho}
+        """
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+        json_path = os.path.join(directory, f"{self.stage}_{run_id}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        prom_path = os.path.join(directory, f"perdigao_{self.stage}.prom")
+        tmp_path = f"{prom_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(summary))
+        os.replace(tmp_path, prom_path)
+        return {'json': json_path, 'prometheus': prom_path}
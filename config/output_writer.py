@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escrita incremental das linhas de produtos (CSV ou JSONL)
+Cada linha é gravada assim que é extraída, com flush em lotes, em um
+arquivo temporário (.part) que só é renomeado para o nome final ao término
+"""
+
+import csv
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from extractor import COLUMN_ORDER
+
+
+FORMATS = ('csv', 'jsonl')
+
+
+class StreamingWriter:
+    def __init__(self, path: str, fmt: Optional[str] = None, columns: List[str] = COLUMN_ORDER,
+                 batch_size: int = 20, transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None):
+        """
+        Abre o arquivo temporário de saída
+
+        Args:
+            path: Caminho final do arquivo
+            fmt: 'csv' ou 'jsonl' (padrão: deduzido da extensão)
+            columns: Ordem das colunas
+            batch_size: Linhas acumuladas antes de cada flush para o disco
+            transform: Função aplicada a cada lote como DataFrame antes da gravação
+                       (ex: cleaning.clean_nutritional_frame para limpeza em lote)
+        """
+        self.fmt = fmt or ('jsonl' if path.endswith('.jsonl') else 'csv')
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Formato de saída inválido: {self.fmt} (use {', '.join(FORMATS)})")
+        self.path = path
+        self.part_path = path + '.part'
+        self.columns = list(columns)
+        self.batch_size = max(1, batch_size)
+        self.transform = transform
+        self.rows_written = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(self.part_path, 'w', encoding='utf-8', newline='')
+        if self.fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore', lineterminator='\n')
+            self._csv.writeheader()
+            self._file.flush()
+
+    def write(self, row: Dict):
+        """Adiciona uma linha (thread-safe); grava em disco a cada lote"""
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        rows = self._buffer
+        if self.transform is not None:
+            rows = self.transform(pd.DataFrame(rows)).to_dict('records')
+        if self.fmt == 'csv':
+            self._csv.writerows(rows)
+        else:
+            # Mesma ordem de colunas do CSV
+            self._file.writelines(
+                json.dumps({col: row[col] for col in self.columns if col in row}, ensure_ascii=False) + '\n'
+                for row in rows
+            )
+        self._file.flush()
+        self.rows_written += len(self._buffer)
+        self._buffer.clear()
+
+    def flush(self):
+        """Grava em disco as linhas pendentes"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> str:
+        """
+        Finaliza o arquivo: grava o restante, sincroniza e renomeia de forma atômica
+
+        Returns:
+            Caminho final do arquivo
+        """
+        with self._lock:
+            if self._closed:
+                return self.path
+            self._flush_locked()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.part_path, self.path)
+            self._closed = True
+        return self.path
+
+    def abort(self):
+        """Grava o que já foi extraído e fecha mantendo o arquivo .part"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline em estágios para o PerdigaoScraper
+Threads de download alimentam uma fila limitada com o HTML bruto, um pool
+de processos faz parsing e limpeza, e o coletor monta as linhas na ordem
+das URLs de entrada. Fila cheia bloqueia os downloads (backpressure)
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from extractor import parse_product_page
+from log_setup import init_worker_logging, process_log_queue
+
+
+# Marcador colocado na fila quando o gerador de URLs termina
+END_OF_URLS = object()
+
+# Processos de parsing via forkserver (spawn onde não existe): um fork deste processo, que já tem
+# as threads de download, de envio e do logging rodando, pode herdar um lock travado e travar
+MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Intervalo (segundos) em que um put bloqueado na fila cheia confere se o pipeline foi interrompido
+PUT_POLL_INTERVAL = 0.1
+
+
+def _put(pages: queue.Queue, item: tuple, stop: threading.Event) -> bool:
+    """Coloca o item na fila, desistindo se o pipeline for interrompido; retorna False nesse caso"""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=PUT_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class ScrapePipeline:
+    def __init__(self, scraper, fetch_workers: int = 8, parse_workers: int = 2, queue_size: int = 32):
+        """
+        Inicializa o pipeline
+
+        Args:
+            scraper: PerdigaoScraper usado para os downloads (cache, arquivo, limite por host)
+            fetch_workers: Threads de download
+            parse_workers: Processos de parsing
+            queue_size: Máximo de páginas baixadas aguardando parsing
+        """
+        self.scraper = scraper
+        self.logger = scraper.logger
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = max(1, queue_size)
+
+    def _fetch(self, index: int, url: str, pages: queue.Queue, stop: threading.Event):
+        """Baixa uma página e a coloca na fila (bloqueia se a fila estiver cheia, até `stop`)"""
+        if stop.is_set():
+            return
+        content = None
+        try:
+            self.logger.debug("Acessando página: %s", url, extra={'url': url})
+            content = self.scraper.fetch_page(url)
+        except Exception as e:
+            self.logger.error("Erro ao carregar página %s: %s", url, e, extra={'url': url})
+        _put(pages, (index, url, content), stop)
+
+    def run(self, urls: Iterable[str],
+            on_result: Optional[Callable[[int, Optional[Dict]], None]] = None) -> List[Optional[Dict]]:
+        """
+        Executa o pipeline
+
+        Args:
+            urls: URLs dos produtos; pode ser um gerador, consumido em uma thread
+                  própria enquanto as páginas já recebidas seguem para o parsing
+            on_result: Chamado com (índice, linha ou None) assim que cada URL termina;
+                       quando informado, as linhas não são acumuladas no retorno
+
+        Returns:
+            Lista com a linha de cada URL (None em caso de falha), na ordem de entrada
+        """
+        results: Dict[int, Optional[Dict]] = {}
+        # Definido pela thread de envio quando o gerador de URLs termina
+        total: Optional[int] = len(urls) if hasattr(urls, '__len__') else None
+
+        def publish(index: int, product_data: Optional[Dict]):
+            if on_result:
+                on_result(index, product_data)
+            else:
+                results[index] = product_data
+
+        pages: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Sinaliza às threads de envio e de download que o consumidor parou (ex: erro em on_result)
+        stop = threading.Event()
+        in_flight: Dict[Future, tuple] = {}
+        received = 0
+
+        def collect(done: Set[Future]):
+            for future in done:
+                index, url = in_flight.pop(future)
+                try:
+                    product_data, timings = future.result()
+                except Exception as e:
+                    self.logger.error("Erro ao processar página %s: %s", url, e, extra={'url': url})
+                    publish(index, None)
+                    continue
+                self.scraper.record_parse_time(timings['parse'])
+                for phase, seconds in timings.items():
+                    self.scraper.metrics.record(url, phase, seconds)
+                self.logger.debug("Scraping concluído para: %s (%d/%s)", product_data['NOME_PRODUTO'],
+                                  index + 1, total or '?', extra={'url': url})
+                publish(index, product_data)
+
+        # Os avisos da extração nos processos de parsing voltam pela fila de logs
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers, \
+                process_log_queue(MP_CONTEXT) as log_queue, \
+                ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=MP_CONTEXT,
+                                    initializer=init_worker_logging,
+                                    initargs=(log_queue, logging.getLogger().getEffectiveLevel())) as parsers:
+            def feed():
+                # Envia os downloads conforme as URLs chegam e avisa o fim com um marcador
+                count = 0
+                try:
+                    for index, url in enumerate(urls):
+                        if stop.is_set():
+                            break
+                        fetchers.submit(self._fetch, index, url, pages, stop)
+                        count += 1
+                except Exception as e:
+                    # Depois do stop, o pool de downloads já pode estar encerrado
+                    if not stop.is_set():
+                        self.logger.error("Erro ao gerar as URLs do pipeline: %s", e)
+                finally:
+                    _put(pages, (END_OF_URLS, None, count), stop)
+
+            feeder = threading.Thread(target=feed, name='pipeline-feed', daemon=True)
+            feeder.start()
+
+            try:
+                while total is None or received < total:
+                    index, url, content = pages.get()
+                    if index is END_OF_URLS:
+                        total = content
+                        continue
+                    received += 1
+                    if content is None:
+                        publish(index, None)
+                        continue
+                    # Limita as páginas em parsing para não esvaziar a fila sem controle
+                    while len(in_flight) >= self.parse_workers * 2:
+                        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                        collect(done)
+                    future = parsers.submit(parse_product_page, url, content,
+                                            self.scraper.parser, self.scraper.parse_only is not None,
+                                            self.scraper.clean_mode == 'row')
+                    in_flight[future] = (index, url)
+
+                while in_flight:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(done)
+                feeder.join()
+            except BaseException:
+                # Erro no consumidor (ex: on_result) ou interrupção: sem o stop, downloads presos
+                # em put na fila cheia impediriam a saída do with (join dos pools) para sempre
+                stop.set()
+                for future in in_flight:
+                    future.cancel()
+                while True:
+                    try:
+                        pages.get_nowait()
+                    except queue.Empty:
+                        break
+                raise
+
+        return [results.get(index) for index in range(total)]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de CPU e memória das execuções (--profile)
+Cada etapa (ex: coleta, scraping, saída) é medida com o cProfile em todas as
+threads, com um amostrador de pilhas e com o tracemalloc, e gera em
+dados/profiles/<execução>/:
+  <etapa>.pstats  estatísticas do cProfile (python -m pstats, snakeviz)
+  <etapa>.folded  pilhas no formato "collapsed" (flamegraph.pl, speedscope)
+  <etapa>.txt     resumo: funções mais caras, pico de memória e maiores alocações
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'profiles')
+
+# Linhas de cada tabela do resumo
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+# Intervalo entre amostras de pilha (segundos)
+SAMPLE_INTERVAL = 0.005
+
+# Espera máxima (segundos) pelo fim das threads criadas na etapa antes de ler os perfis delas
+THREAD_JOIN_TIMEOUT = 2.0
+
+# A partir do Python 3.12 o cProfile usa sys.monitoring e já enxerga todas as threads;
+# antes disso cada thread nova precisa de um profiler próprio
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+# "ThreadPoolExecutor-0_3" -> "ThreadPoolExecutor-0": threads do mesmo pool viram uma pilha só
+THREAD_SUFFIX = re.compile(r'_\d+$')
+
+# Alocações do próprio tracemalloc e do import não entram no resumo
+ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Amostra as pilhas de todas as threads a intervalos fixos, para flamegraph
+
+    É tempo de parede: esperas de rede e de filas também aparecem, o que
+    complementa o cProfile (tempo de cada função, sem a pilha completa)
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(THREAD_SUFFIX.sub('', names.get(ident, 'thread')))
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_folded(self, path: str):
+        """Grava uma linha "thread;função;...;função amostras" por pilha distinta"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class ThreadProfiles:
+    """
+    Um cProfile por thread criada durante a etapa (Python < 3.12)
+
+    Antes do 3.12, profile.disable() só desliga o profiler na thread que o chama:
+    o perfil de cada thread só é lido depois que ela termina (os pools criados na
+    etapa já foram encerrados ao fim do bloco). Threads que continuam rodando
+    ficam fora do resultado
+    """
+
+    def __init__(self):
+        self.profiles: List[Tuple[threading.Thread, cProfile.Profile]] = []
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def _bootstrap(self, frame, event, arg):
+        # Primeiro evento da thread nova: troca o gancho por um profiler só dela
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append((threading.current_thread(), profile))
+        profile.enable()
+
+    def start(self):
+        threading.setprofile(self._bootstrap)
+
+    def stop(self, timeout: float = THREAD_JOIN_TIMEOUT) -> List[cProfile.Profile]:
+        """Perfis das threads já encerradas, esperando até `timeout` segundos pelas demais"""
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self.profiles)
+        deadline = time.monotonic() + timeout
+        finished = []
+        for thread, profile in profiles:
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                self.running += 1
+                continue
+            # A thread terminou: nada mais escreve no profiler, que pode ser lido daqui
+            profile.create_stats()
+            finished.append(profile)
+        return finished
+
+
+class RunProfiler:
+    def __init__(self, run_id: str, directory: str = PROFILES_DIR):
+        """
+        Perfil de uma execução, dividido em etapas
+
+        Args:
+            run_id: Nome da pasta da execução (ex: o nome do CSV, 'produtos_perdigao_<timestamp>')
+            directory: Pasta onde ficam as pastas das execuções
+        """
+        self.directory = os.path.join(directory, run_id)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Mede o bloco como a etapa `name` e grava os arquivos dela ao sair
+        (também se o bloco terminar com erro); etapas não podem ser aninhadas
+        """
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot()
+        sampler = StackSampler()
+        threads = ThreadProfiles() if not PROFILER_SEES_ALL_THREADS else None
+        profile = cProfile.Profile()
+
+        inicio = time.perf_counter()
+        cpu_inicio = time.process_time()
+        sampler.start()
+        if threads is not None:
+            threads.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            thread_profiles = threads.stop() if threads is not None else []
+            running = threads.running if threads is not None else 0
+            sampler.stop()
+            duration = time.perf_counter() - inicio
+            cpu = time.process_time() - cpu_inicio
+            current, peak = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS).compare_to(
+                baseline.filter_traces(ALLOCATION_FILTERS), 'lineno')
+            if not tracing:
+                tracemalloc.stop()
+            self._save(name, profile, thread_profiles, sampler, allocations,
+                       {'duration_s': duration, 'cpu_s': cpu, 'current_bytes': current, 'peak_bytes': peak,
+                        'running_threads': running})
+
+    def _save(self, name: str, profile: cProfile.Profile, thread_profiles: List[cProfile.Profile],
+              sampler: StackSampler, allocations: List[tracemalloc.StatisticDiff], totals: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+
+        stats = pstats.Stats(profile)
+        for thread_profile in thread_profiles:
+            stats.add(thread_profile)
+        stats.dump_stats(f"{base}.pstats")
+        sampler.write_folded(f"{base}.folded")
+
+        report = io.StringIO()
+        report.write(f"Etapa: {name}\n")
+        threads = 'todas' if PROFILER_SEES_ALL_THREADS else f"principal + {len(thread_profiles)} criadas na etapa"
+        if totals['running_threads']:
+            threads += f" ({totals['running_threads']} ainda em execução, fora do perfil)"
+        report.write(f"Duração: {totals['duration_s']:.2f}s | CPU do processo: {totals['cpu_s']:.2f}s | "
+                     f"threads no cProfile: {threads}\n")
+        report.write(f"Memória (tracemalloc): pico {totals['peak_bytes'] / 1024 ** 2:.1f} MB | "
+                     f"ao final {totals['current_bytes'] / 1024 ** 2:.1f} MB\n")
+        stats.stream = report
+        stats.strip_dirs()
+        for key, title in (('cumulative', 'tempo acumulado'), ('tottime', 'tempo próprio')):
+            report.write(f"\n=== Funções por {title} ===\n")
+            stats.sort_stats(key).print_stats(TOP_FUNCTIONS)
+        report.write("\n=== Maiores alocações da etapa ainda em uso ao final ===\n")
+        for stat in allocations[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            report.write(f"{stat.size_diff / 1024:+10.1f} KB {stat.count_diff:+8d} blocos  "
+                         f"{frame.filename}:{frame.lineno}\n")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        print(f"🔬 Perfil da etapa {name}: {totals['duration_s']:.2f}s | "
+              f"pico de memória {totals['peak_bytes'] / 1024 ** 2:.1f} MB | {base}.txt")
+
+
+def profile_stage(profiler: Optional[RunProfiler], name: str):
+    """profiler.stage(name), ou um bloco sem medição se o perfil estiver desligado"""
+    return profiler.stage(name) if profiler is not None else nullcontext()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controle de taxa das requisições ao site
+Orçamento de cortesia compartilhado entre threads (token bucket), usado no
+lugar de pausas fixas entre requisições, e controlador adaptativo (AIMD) que
+ajusta a concorrência conforme a resposta do servidor
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+
+class RequestBudget:
+    """Token bucket thread-safe: no máximo `rate` requisições por segundo, com rajada de `burst`"""
+
+    def __init__(self, rate: float = 2.0, burst: int = 1):
+        """
+        Args:
+            rate: Requisições por segundo permitidas em regime (0 = sem limite)
+            burst: Requisições que podem sair de imediato antes do limite valer
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self) -> float:
+        """
+        Reserva uma requisição, esperando se o orçamento estiver esgotado
+
+        As reservas são feitas em ordem de chegada: quem chega com o balde
+        vazio fica com saldo negativo e dorme até a sua vez
+
+        Returns:
+            Tempo de espera em segundos
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# Respostas que indicam sobrecarga do servidor
+THROTTLE_STATUS = (429, 503)
+
+# Teto para o Retry-After, para um cabeçalho absurdo não travar a execução
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos
+
+    Returns:
+        Segundos de espera, ou None se ausente/inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class _Ticket:
+    """Resultado de uma requisição controlada, preenchido por observe()"""
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, response):
+        """Registra o status e o Retry-After da resposta (requests.Response ou CacheResult)"""
+        self.status = response.status_code
+        self.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+
+class AdaptiveLimiter:
+    """
+    Limite de requisições simultâneas ajustado por AIMD
+
+    Sobe o limite aditivamente (+1 a cada `limit` respostas boas) enquanto a
+    latência está estável; corta multiplicativamente em 429/503, erros de
+    conexão ou latência subindo, e suspende novas requisições pelo tempo
+    pedido no Retry-After
+    """
+
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 16,
+                 decrease: float = 0.5, latency_tolerance: float = 1.5, rate_window: float = 5.0):
+        """
+        Args:
+            initial: Limite inicial de requisições simultâneas
+            min_limit: Limite mínimo
+            max_limit: Limite máximo (normalmente o número de workers)
+            decrease: Fator de corte ao detectar sobrecarga
+            latency_tolerance: Razão entre latência recente e de referência que indica sobrecarga
+            rate_window: Janela (segundos) para o cálculo da vazão atual
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.rate_window = rate_window
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        # Latência recente (EWMA rápida) contra a de referência (EWMA lenta)
+        self._fast_latency: Optional[float] = None
+        self._slow_latency: Optional[float] = None
+        self._samples = 0
+        self._completions = deque()
+
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'decreases': 0,
+                      'paused_s': 0.0, 'peak_limit': self.limit}
+
+    def acquire(self):
+        """Espera até haver vaga no limite atual e nenhuma pausa de Retry-After"""
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self._in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._in_flight += 1
+
+    def release(self, latency: float, status: Optional[int], retry_after: Optional[float] = None):
+        """
+        Libera a vaga e ajusta o limite conforme o resultado
+
+        Args:
+            latency: Duração da requisição em segundos
+            status: Status HTTP (None = erro de conexão/timeout, 0 = sem sinal do servidor)
+            retry_after: Segundos pedidos pelo servidor no Retry-After
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight -= 1
+            self.stats['requests'] += 1
+            self._completions.append(now)
+            while self._completions and now - self._completions[0] > self.rate_window:
+                self._completions.popleft()
+
+            if status is None or status in THROTTLE_STATUS:
+                self.stats['errors' if status is None else 'throttled'] += 1
+                self._backoff(now)
+                if retry_after:
+                    until = now + retry_after
+                    if until > self._paused_until:
+                        self.stats['paused_s'] += until - max(now, self._paused_until)
+                        self._paused_until = until
+            elif 0 < status < 500:
+                self._samples += 1
+                if self._fast_latency is None:
+                    self._fast_latency = self._slow_latency = latency
+                else:
+                    self._fast_latency += 0.3 * (latency - self._fast_latency)
+                    self._slow_latency += 0.05 * (latency - self._slow_latency)
+                if self._samples >= 10 and self._fast_latency > self._slow_latency * self.latency_tolerance:
+                    self._backoff(now)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                    self.stats['peak_limit'] = max(self.stats['peak_limit'], self.limit)
+            self._cond.notify_all()
+
+    def _backoff(self, now: float):
+        # Um corte por "ida e volta": respostas da mesma rajada não cortam de novo
+        cooldown = max(self._fast_latency or 0.0, 0.05)
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.stats['decreases'] += 1
+
+    @contextmanager
+    def request(self):
+        """
+        Envolve uma requisição: ocupa uma vaga e, ao final, ajusta o limite
+
+        Uso:
+            with limiter.request() as ticket:
+                response = session.get(url)
+                ticket.observe(response)
+        """
+        self.acquire()
+        ticket = _Ticket()
+        start = time.monotonic()
+        status = None
+        try:
+            yield ticket
+            status = ticket.status
+        except requests.HTTPError as e:
+            if e.response is not None:
+                ticket.observe(e.response)
+            status = ticket.status
+            raise
+        except requests.RequestException:
+            # Erro de conexão ou timeout
+            status = None
+            raise
+        except Exception:
+            # Erro fora da requisição: não é sinal do servidor
+            status = ticket.status or 0
+            raise
+        finally:
+            self.release(time.monotonic() - start, status, ticket.retry_after)
+
+    def current_rate(self) -> float:
+        """Vazão atual em respostas por segundo (janela de rate_window segundos)"""
+        with self._cond:
+            now = time.monotonic()
+            recent = [t for t in self._completions if now - t <= self.rate_window]
+        if len(recent) < 2:
+            return 0.0
+        return len(recent) / max(now - recent[0], 1e-6)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Resumo do estado do controlador"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['limit'] = self.limit
+            stats['latency_s'] = self._fast_latency or 0.0
+        stats['rate'] = self.current_rate()
+        return stats
+
+    def format_stats(self) -> str:
+        """Formata o estado do controlador em uma linha legível"""
+        stats = self.snapshot()
+        return (f"Controle adaptativo: limite {stats['limit']:.1f} simultâneas "
+                f"(pico {stats['peak_limit']:.1f}, máx {self.max_limit}) | {stats['rate']:.1f} req/s | "
+                f"latência {stats['latency_s'] * 1000:.0f} ms | {stats['decreases']} reduções | "
+                f"{stats['throttled']} respostas 429/503 | {stats['errors']} erros de conexão | "
+                f"pausa Retry-After {stats['paused_s']:.1f}s")
+
+
+_shared_limiter: Optional[AdaptiveLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter(**kwargs) -> AdaptiveLimiter:
+    """
+    Retorna o controlador adaptativo compartilhado pelo coletor e pelo scraper,
+    criando-o na primeira chamada (os argumentos só valem nessa chamada)
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveLimiter(**kwargs)
+        return _shared_limiter
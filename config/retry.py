@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Retentativas classificadas e disjuntor (circuit breaker) por host
+Erros de conexão, timeouts, 5xx e 429 são tentados de novo com backoff
+exponencial e jitter; 404 e demais 4xx falham na hora. Quando um host
+acumula falhas seguidas, o disjuntor abre e as próximas requisições falham
+imediatamente, sem esperar timeouts, até uma nova tentativa de teste
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+from rate_control import parse_retry_after
+
+
+T = TypeVar('T')
+
+_logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """O disjuntor do host está aberto: a requisição nem foi feita"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Classifica o erro: True se vale tentar de novo
+
+    Conexão recusada/caída, timeout, 5xx e 429 são transitórios; 404 e os
+    demais 4xx, páginas ausentes do arquivo e erros de parsing não são
+    """
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status >= 500 or status == 429
+    return isinstance(error, (requests.ConnectionError, requests.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+def is_host_failure(error: Exception) -> bool:
+    """True se o erro indica host fora do ar ou sobrecarregado (conta para o disjuntor)"""
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class CircuitBreaker:
+    """Disjuntor por host: fechado -> aberto após N falhas seguidas -> meio-aberto após o tempo de espera"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Falhas seguidas de um host que abrem o disjuntor
+            reset_timeout: Segundos com o disjuntor aberto antes de liberar uma requisição de teste
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._probing: Dict[str, bool] = {}
+        self.opened = 0
+        self.rejected = 0
+
+    def before_request(self, host: str) -> bool:
+        """
+        Verifica se o host pode ser acessado
+
+        Returns:
+            True se esta é a requisição de teste do disjuntor meio-aberto: quem a recebe
+            precisa encerrá-la com record_success, record_failure ou release_probe
+
+        Raises:
+            CircuitOpenError: Se o disjuntor estiver aberto (ou já houver um teste em andamento)
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return False
+            if time.monotonic() - opened_at >= self.reset_timeout and not self._probing.get(host):
+                # Meio-aberto: deixa passar uma requisição de teste
+                self._probing[host] = True
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(f"Disjuntor aberto para {host}: requisição recusada sem acessar o site")
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._probing.pop(host, None)
+
+    def release_probe(self, host: str):
+        """Libera o teste interrompido sem resultado (ex: KeyboardInterrupt): a próxima requisição testa de novo"""
+        with self._lock:
+            self._probing.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            if self._probing.pop(host, False):
+                # O teste falhou: volta a abrir por mais um período
+                self._opened_at[host] = time.monotonic()
+                return
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.failure_threshold and host not in self._opened_at:
+                self._opened_at[host] = time.monotonic()
+                self.opened += 1
+
+
+class Retrier:
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None, logger: Optional[logging.Logger] = None):
+        """
+        Executa requisições com retentativas classificadas e disjuntor por host
+
+        Args:
+            max_attempts: Tentativas por URL, incluindo a primeira (1 = sem retentativa)
+            base_delay: Espera base do backoff exponencial (segundos)
+            max_delay: Espera máxima entre tentativas (segundos)
+            breaker: Disjuntor por host (padrão: CircuitBreaker())
+            logger: Logger para as retentativas (opcional)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.logger = logger or _logger
+        self._lock = threading.Lock()
+        self.stats = {'retries': 0, 'recovered': 0, 'failed': 0, 'not_retried': 0}
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Espera antes da próxima tentativa: jitter completo sobre o backoff exponencial,
+        nunca menor que o Retry-After pedido pelo servidor
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, url: str, request: Callable[[], T]) -> T:
+        """
+        Executa request() com retentativas
+
+        Args:
+            url: URL acessada (o host define o disjuntor)
+            request: Função que faz a requisição e lança exceção em caso de erro
+
+        Returns:
+            O resultado de request()
+
+        Raises:
+            CircuitOpenError: Se o disjuntor do host estiver aberto
+            Exception: O último erro, se não for transitório ou as tentativas acabarem
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            probing = self.breaker.before_request(host)
+            try:
+                result = request()
+            except Exception as e:
+                if is_host_failure(e):
+                    self.breaker.record_failure(host)
+                else:
+                    # O host respondeu (ex: 404): para o disjuntor, está no ar
+                    self.breaker.record_success(host)
+                if not is_retryable(e):
+                    self._count('not_retried')
+                    raise
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    self._count('failed')
+                    raise
+                response = getattr(e, 'response', None)
+                retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+                delay = self.backoff(attempt - 1, retry_after)
+                self._count('retries')
+                self.logger.warning("Tentativa %d/%d falhou para %s (%s); nova tentativa em %.1fs",
+                                    attempt, self.max_attempts, url, e, delay, extra={'url': url})
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Interrupção sem resultado (ex: KeyboardInterrupt): sem liberar o teste,
+                # o host ficaria recusado para sempre
+                if probing:
+                    self.breaker.release_probe(host)
+                raise
+            self.breaker.record_success(host)
+            if attempt:
+                self._count('recovered')
+            return result
+
+    def format_stats(self) -> str:
+        """Resumo das retentativas e do disjuntor em uma linha legível"""
+        with self._lock:
+            stats = dict(self.stats)
+        return (f"Retentativas: {stats['retries']} | recuperadas: {stats['recovered']} | "
+                f"falhas após {self.max_attempts} tentativas: {stats['failed']} | "
+                f"falhas sem retentativa (ex: 404): {stats['not_retried']} | "
+                f"disjuntor aberto: {self.breaker.opened}x | recusadas pelo disjuntor: {self.breaker.rejected}")
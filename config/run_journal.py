@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diário de execução (checkpoint) do scraper
+Registra em JSON lines as URLs planejadas, concluídas (com a linha extraída)
+e com falha, permitindo retomar uma execução interrompida sem refazer o
+trabalho já concluído. O diário é removido quando a execução termina sem
+falhas; com URLs que falharam, fica para o --resume tentá-las de novo
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'journal')
+
+
+class RunJournal:
+    def __init__(self, path: str):
+        """
+        Abre um diário existente
+
+        Args:
+            path: Caminho do arquivo .jsonl do diário
+        """
+        self.path = path
+        self.output = ''
+        self.fused = False
+        self.urls: List[str] = []
+        self.completed: Dict[str, Dict] = {}
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._known = set(self.urls)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def create(cls, output: str, urls: List[str], journal_dir: str = JOURNAL_DIR,
+               fused: bool = False) -> 'RunJournal':
+        """
+        Cria o diário de uma nova execução
+
+        Args:
+            output: Arquivo de saída da execução
+            urls: URLs a processar
+            journal_dir: Pasta dos diários
+            fused: Execução no modo fundido: as URLs são registradas conforme o
+                   crawler as descobre (record_url) e a retomada refaz a descoberta
+        """
+        os.makedirs(journal_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(output))[0]
+        path = os.path.join(journal_dir, f"{name}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            header = {'event': 'start', 'output': output, 'urls': urls, 'fused': fused,
+                      'started_at': time.time()}
+            f.write(json.dumps(header, ensure_ascii=False) + '\n')
+        return cls(path)
+
+    @classmethod
+    def find_unfinished(cls, journal_dir: str = JOURNAL_DIR) -> Optional['RunJournal']:
+        """Retorna o diário inacabado mais recente, ou None"""
+        paths = glob.glob(os.path.join(journal_dir, '*.jsonl'))
+        if not paths:
+            return None
+        return cls(max(paths, key=os.path.getmtime))
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última linha truncada por uma interrupção
+                    continue
+                event = record.get('event')
+                if event == 'start':
+                    self.output = record['output']
+                    self.urls = record['urls']
+                    self.fused = record.get('fused', False)
+                elif event == 'url':
+                    if record['url'] not in self.urls:
+                        self.urls.append(record['url'])
+                elif event == 'done':
+                    self.completed[record['url']] = record['row']
+                    self.failed.pop(record['url'], None)
+                elif event == 'failed':
+                    self.failed[record['url']] = record.get('error', '')
+
+    def _append(self, record: Dict):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def record_url(self, url: str) -> bool:
+        """
+        Acrescenta uma URL descoberta durante a execução (modo fundido com o coletor)
+
+        Returns:
+            False se a URL já estava no diário (ex: redescoberta ao retomar)
+        """
+        with self._lock:
+            if url in self._known:
+                return False
+            self._known.add(url)
+        self.urls.append(url)
+        self._append({'event': 'url', 'url': url})
+        return True
+
+    def record_done(self, url: str, row: Dict):
+        """Registra uma URL concluída junto com a linha extraída"""
+        self.completed[url] = row
+        self.failed.pop(url, None)
+        self._append({'event': 'done', 'url': url, 'row': row})
+
+    def record_failed(self, url: str, error: str = ''):
+        """Registra uma URL com falha (será tentada de novo ao retomar)"""
+        self.failed[url] = error
+        self._append({'event': 'failed', 'url': url, 'error': error})
+
+    def pending_urls(self) -> List[str]:
+        """URLs ainda não concluídas (pendentes ou com falha), na ordem original"""
+        return [url for url in self.urls if url not in self.completed]
+
+    def completed_rows(self) -> List[Dict]:
+        """Linhas já extraídas, na ordem original das URLs"""
+        return [self.completed[url] for url in self.urls if url in self.completed]
+
+    def summary(self) -> str:
+        """Resumo do progresso registrado"""
+        return (f"{len(self.completed)} concluídas, {len(self.failed)} com falha, "
+                f"{len(self.pending_urls())} pendentes de {len(self.urls)}")
+
+    def finish(self) -> bool:
+        """
+        Encerra a execução; o diário só é removido se nenhuma URL ficou com falha
+
+        Returns:
+            True se o diário foi removido, False se foi mantido para o --resume
+        """
+        self.close()
+        if self.failed:
+            return False
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return True
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
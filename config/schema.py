@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esquema tipado dos dados de produtos e saída colunar (Parquet/Arrow)
+Converte os nutrientes para float, a porção para inteiro e os campos
+derivados da URL (categoria/subcategoria) para categóricos
+"""
+
+from typing import List, Optional
+
+import pandas as pd
+
+from extractor import REQUIRED_FIELDS
+
+
+NUTRIENT_COLUMNS = list(REQUIRED_FIELDS)
+CATEGORY_COLUMNS = ['CATEGORIA', 'SUBCATEGORIA']
+
+# Extensão do arquivo -> formato colunar
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather'}
+DEFAULT_COMPRESSION = 'zstd'
+
+# /produtos/<categoria>/<subcategoria>/<produto>
+URL_FIELDS_PATTERN = r'/produtos/(?P<CATEGORIA>[^/]+)/(?P<SUBCATEGORIA>[^/]+)/'
+
+
+def derive_url_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """Adiciona CATEGORIA e SUBCATEGORIA extraídas da URL do produto"""
+    fields = df['URL'].astype(str).str.extract(URL_FIELDS_PATTERN)
+    return df.assign(**{col: fields[col] for col in CATEGORY_COLUMNS})
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte o DataFrame de texto para o esquema tipado
+
+    Args:
+        df: DataFrame com os valores como texto (saída do scraper)
+
+    Returns:
+        Novo DataFrame com nutrientes float64, porção Int64, nome/URL string
+        e categoria/subcategoria categóricas
+    """
+    df = df.copy()
+    if 'CATEGORIA' not in df.columns and 'URL' in df.columns:
+        df = derive_url_fields(df)
+    for col in NUTRIENT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    if 'PORCAO (g)' in df.columns:
+        df['PORCAO (g)'] = pd.to_numeric(df['PORCAO (g)'], errors='coerce').round().astype('Int64')
+    for col in ('NOME_PRODUTO', 'URL'):
+        if col in df.columns:
+            df[col] = df[col].astype('string')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """Retorna 'parquet' ou 'feather' conforme a extensão, ou None"""
+    for extension, fmt in COLUMNAR_FORMATS.items():
+        if path.endswith(extension):
+            return fmt
+    return None
+
+
+def save_columnar(df: pd.DataFrame, path: str, compression: str = DEFAULT_COMPRESSION) -> str:
+    """
+    Salva o DataFrame tipado em Parquet ou Feather (Arrow IPC)
+
+    Args:
+        df: DataFrame (texto ou já tipado)
+        path: Caminho com extensão .parquet, .feather ou .arrow
+        compression: Codec de compressão (zstd, lz4, snappy...)
+
+    Returns:
+        Caminho do arquivo salvo
+
+    Raises:
+        ImportError: Se o pyarrow não estiver instalado
+    """
+    fmt = columnar_format(path)
+    if fmt is None:
+        raise ValueError(f"Extensão não suportada para saída colunar: {path}")
+    typed = apply_schema(df)
+    if fmt == 'parquet':
+        typed.to_parquet(path, index=False, compression=compression)
+    else:
+        typed.reset_index(drop=True).to_feather(path, compression=compression)
+    return path
+
+
+def load_columnar(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Carrega um arquivo colunar lendo apenas as colunas pedidas, via memory map
+
+    Args:
+        path: Arquivo .parquet, .feather ou .arrow
+        columns: Colunas a carregar (padrão: todas)
+    """
+    if columnar_format(path) == 'parquet':
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    from pyarrow import feather
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
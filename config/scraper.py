@@ -7,142 +7,239 @@ Extrai informações da tabela nutricional e cria um DataFrame
 
 import sys
 sys.path.append('.')
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
-import re
+from bs4.builder import builder_registry
 import logging
 import json
-from typing import Dict, Optional, List
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlparse
+from typing import Callable, Dict, Iterable, Iterator, Optional, List
 from datetime import datetime
 import os
+import time
+
+from http_client import DEFAULT_HEADERS, format_connection_stats, get_session, track_timing
+from http_cache import HTTPCache
+from html_archive import HTMLArchive
+import delta
+from extractor import (COLUMN_ORDER, NUTRICIONAL_MAPPING, TARGETED_STRAINER, build_product_row,
+                       build_raw_row, extract_product)
+import extractor
+from pipeline import ScrapePipeline
+from output_writer import StreamingWriter
+from run_journal import RunJournal
+from schema import DEFAULT_COMPRESSION, save_columnar
+from cleaning import clean_nutritional_frame
+from rate_control import AdaptiveLimiter, get_shared_limiter
+from retry import Retrier
+from metrics import RunMetrics
+import log_setup
+from profiling import RunProfiler, profile_stage
+import url_collector
+import sitemap
+
+
+# Pasta de saída dos arquivos
+DADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados')
+
+# Backends do BeautifulSoup em ordem de preferência para o modo 'auto'
+PARSER_PREFERENCE = ['lxml', 'html.parser']
+
+
+def available_parsers() -> List[str]:
+    """Lista os backends de parsing HTML instalados"""
+    return [name for name in ('lxml', 'html5lib', 'html.parser') if builder_registry.lookup(name)]
+
+
+def resolve_parser(parser: str) -> str:
+    """
+    Resolve o nome do backend de parsing
+    
+    Args:
+        parser: 'auto' ou um backend do BeautifulSoup (html.parser, lxml, html5lib)
+        
+    Returns:
+        Nome do backend a ser usado
+    """
+    if parser == 'auto':
+        for name in PARSER_PREFERENCE:
+            if builder_registry.lookup(name):
+                return name
+        return 'html.parser'
+    if not builder_registry.lookup(parser):
+        raise ValueError(f"Parser '{parser}' não está instalado (disponíveis: {', '.join(available_parsers())})")
+    return parser
 
 
 class PerdigaoScraper:
-    def __init__(self):
-        """Inicializa o scraper com requests"""
+    def __init__(self, max_workers: int = 1, max_per_host: int = 4, cache: Optional[HTTPCache] = None,
+                 archive: Optional[HTMLArchive] = None, replay: bool = False,
+                 parser: str = 'auto', targeted: bool = True, parse_workers: int = 0,
+                 clean_mode: str = 'row', limiter: Optional[AdaptiveLimiter] = None,
+                 retrier: Optional[Retrier] = None):
+        """
+        Inicializa o scraper com requests
+        
+        Args:
+            max_workers: Número de threads usadas em scrape_products (1 = sequencial)
+            max_per_host: Máximo de requisições simultâneas para um mesmo host
+            cache: Cache HTTP com GET condicional (opcional)
+            archive: Arquivo de HTML bruto onde cada resposta é gravada (opcional)
+            replay: Lê as páginas do arquivo em vez da rede
+            parser: Backend do BeautifulSoup ('auto', 'html.parser', 'lxml', 'html5lib')
+            targeted: Constrói apenas os nós usados pelos extratores (SoupStrainer)
+            parse_workers: Processos de parsing; > 0 ativa o pipeline download/parsing
+                           em estágios (0 = parsing na mesma thread do download)
+            clean_mode: 'row' limpa cada valor na extração; 'batch' mantém os textos brutos
+                        e limpa colunas inteiras de forma vetorizada (no DataFrame final
+                        ou nos lotes de um StreamingWriter com transform=clean_nutritional_frame)
+            limiter: Controlador adaptativo que ajusta as requisições simultâneas conforme
+                     a resposta do servidor (opcional; max_workers passa a ser o teto)
+            retrier: Retentativas com backoff e disjuntor por host
+                     (padrão: Retrier() com 3 tentativas; Retrier(max_attempts=1) desativa)
+        """
         self.setup_logging()
         
-        # Headers para simular navegador
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        # Configuração de concorrência
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.parse_workers = max(0, parse_workers)
+        if clean_mode not in ('row', 'batch'):
+            raise ValueError(f"clean_mode inválido: {clean_mode} (use 'row' ou 'batch')")
+        self.clean_mode = clean_mode
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_semaphores_lock = threading.Lock()
+        
+        # Sessão HTTP compartilhada, cache e arquivo de HTML opcionais
+        self.session = get_session()
+        self.cache = cache
+        self.archive = archive
+        self.replay = replay
+        self.limiter = limiter
+        self.retrier = retrier or Retrier(logger=self.logger)
+        if replay and archive is None:
+            raise ValueError("O modo replay exige um HTMLArchive")
+        
+        # Backend de parsing e estatísticas de tempo de parsing
+        self.parser = resolve_parser(parser)
+        # html5lib não suporta parse_only
+        self.parse_only = TARGETED_STRAINER if targeted and self.parser != 'html5lib' else None
+        self.parse_stats = {'pages': 0, 'total_s': 0.0, 'max_s': 0.0}
+        self._parse_stats_lock = threading.Lock()
+        
+        # Tempos por fase de cada URL (conexão, primeiro byte, download, parsing, extração, limpeza)
+        self.metrics = RunMetrics('scraper')
+        
+        # Headers para simular navegador (compartilhados com o cliente HTTP)
+        self.headers = dict(DEFAULT_HEADERS)
         
         # Mapeamento de campos nutricionais
-        self.nutricional_mapping = {
-            'Carboidratos (g)': 'CARBOIDRATOS (g)',
-            'Proteínas (g)': 'PROTEINAS (g)',
-            'Gorduras Totais (g)': 'GORDURAS_TOTAIS (g)',
-            'Gorduras Saturadas (g)': 'GORDURAS_SATURADAS (g)',
-            'Fibra Alimentar (g)': 'FIBRAS (g)',
-            'Açúcares Totais (g)': 'ACUCARES (g)',
-            'Sódio (mg)': 'SODIO (mg)'
-        }
+        self.nutricional_mapping = dict(NUTRICIONAL_MAPPING)
     
     def setup_logging(self):
-        """Configura o sistema de logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('scraper_perdigao.log', encoding='utf-8')
-            ]
-        )
+        """
+        Configura o logging assíncrono (terminal + dados/logs/scraper_perdigao.jsonl),
+        se ainda não houver um configurado (ver log_setup.setup_logging)
+        """
+        log_setup.setup_logging()
         self.logger = logging.getLogger(__name__)
     
-    def get_page_content(self, url: str) -> Optional[BeautifulSoup]:
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Limita o número de requisições simultâneas por host"""
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+        with semaphore:
+            yield
+    
+    def _limiter_slot(self):
+        """Vaga no controlador adaptativo (ou nenhum controle, se não houver)"""
+        return self.limiter.request() if self.limiter is not None else nullcontext()
+    
+    def _request(self, url: str, timing: Optional[Dict[str, float]] = None):
         """
-        Usa requests para obter o HTML da página
+        Uma tentativa de download (cache ou rede), dentro das vagas de host e do controlador
+        Os tempos de rede da tentativa são somados em `timing` (ver http_client.track_timing)
         """
-        try:
-            self.logger.info(f"Acessando página: {url}")
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return soup
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar página: {e}")
-            return None
+        with self._host_slot(url), self._limiter_slot() as ticket, track_timing(timing):
+            if self.cache:
+                response = self.cache.fetch(self.session, url, headers=self.headers, timeout=10)
+            else:
+                response = self.session.get(url, headers=self.headers, timeout=10)
+                response.raise_for_status()
+            if ticket is not None:
+                ticket.observe(response)
+        return response
     
-    def extract_product_name(self, soup: BeautifulSoup) -> str:
-        """Extrai o nome do produto da página"""
-        try:
-            # Buscar o título do produto
-            title_element = soup.find('h1', class_='product-title')
-            if title_element:
-                return title_element.get_text(strip=True)
-            
-            # Fallback: buscar qualquer h1
-            h1_element = soup.find('h1')
-            if h1_element:
-                return h1_element.get_text(strip=True)
-            
-            return "Nome não encontrado"
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao extrair nome do produto: {e}")
-            return "Nome não encontrado"
+    def fetch_page(self, url: str) -> bytes:
+        """
+        Obtém o HTML bruto da página (do arquivo no modo replay, senão do cache ou da rede)
+        """
+        if self.replay:
+            content = self.archive.read(url)
+            if content is None:
+                raise LookupError(f"Página não encontrada no arquivo: {url}")
+            return content
+        
+        # As esperas entre tentativas acontecem fora das vagas de host e do controlador
+        # (e fora da medição de tempo de rede)
+        timing: Dict[str, float] = {}
+        response = self.retrier.call(url, lambda: self._request(url, timing))
+        self.metrics.record_network(url, timing, len(response.content))
+        
+        if self.archive is not None:
+            self.archive.append(url, response.content, response.status_code,
+                                response.headers.get('Content-Type', ''))
+        return response.content
     
-
+    def parse_html(self, content: bytes, url: Optional[str] = None) -> BeautifulSoup:
+        """Faz o parsing do HTML com o backend configurado e registra o tempo gasto"""
+        inicio = time.perf_counter()
+        soup = BeautifulSoup(content, self.parser, parse_only=self.parse_only)
+        elapsed = time.perf_counter() - inicio
+        self.record_parse_time(elapsed)
+        if url is not None:
+            self.metrics.record(url, 'parse', elapsed)
+        self.logger.debug("Parsing (%s%s): %.1f ms", self.parser, ', direcionado' if self.parse_only else '',
+                          elapsed * 1000, extra={'url': url})
+        return soup
     
-    def extract_porcao(self, soup: BeautifulSoup) -> str:
-        """Extrai a porção da tabela nutricional"""
-        try:
-            # Buscar a célula que contém "Porção"
-            porcao_cells = soup.find_all('td', class_='nutricional-table-title')
-            for cell in porcao_cells:
-                text = cell.get_text(strip=True)
-                if 'Porção' in text:
-                    # Extrair apenas o valor (ex: "100g" de "Porção 100g")
-                    match = re.search(r'Porção\s*(\d+g)', text)
-                    if match:
-                        return match.group(1)
-            return "100g"  # Valor padrão
-        except Exception as e:
-            self.logger.error(f"Erro ao extrair porção: {e}")
-            return "100g"
+    def record_parse_time(self, elapsed: float):
+        """Acumula o tempo de parsing de uma página"""
+        with self._parse_stats_lock:
+            self.parse_stats['pages'] += 1
+            self.parse_stats['total_s'] += elapsed
+            self.parse_stats['max_s'] = max(self.parse_stats['max_s'], elapsed)
+    
+    def format_parse_stats(self) -> str:
+        """Formata as estatísticas de parsing em uma linha legível"""
+        with self._parse_stats_lock:
+            stats = dict(self.parse_stats)
+        media = stats['total_s'] / stats['pages'] * 1000 if stats['pages'] else 0.0
+        return (f"Parsing ({self.parser}): {stats['pages']} páginas | "
+                f"média {media:.1f} ms | máximo {stats['max_s'] * 1000:.1f} ms | "
+                f"total {stats['total_s']:.2f}s")
     
-    def extract_nutritional_data(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def get_page_content(self, url: str) -> Optional[BeautifulSoup]:
         """
-        Extrai os dados nutricionais da tabela
-        
-        Returns:
-            Dicionário com os valores nutricionais
+        Usa requests para obter o HTML da página
         """
-        nutritional_data = {}
         try:
-            table = soup.find('table', class_='nutricional-table')
-            if not table:
-                self.logger.warning("Tabela nutricional não encontrada")
-                return nutritional_data
-            rows = table.find_all('tr')
-            for row in rows:
-                if row is not None:
-                    cells = row.find_all('td', class_='nutricional-table-row')
-                    if len(cells) >= 2:
-                        nutrient_name = cells[0].get_text(strip=True)
-                        nutrient_value = cells[1].get_text(strip=True)
-                        # Calorias: qualquer campo que comece com 'Valor Energético', ignorando o que está entre parênteses
-                        if re.match(r'^Valor Energético(\s*\(.*\))?$', nutrient_name):
-                            nutritional_data['CALORIAS (kcal)'] = nutrient_value
-                            self.logger.debug(f"Extraído: {nutrient_name} = {nutrient_value}")
-                        elif nutrient_name in self.nutricional_mapping:
-                            field_name = self.nutricional_mapping[nutrient_name]
-                            nutritional_data[field_name] = nutrient_value
-                            self.logger.debug(f"Extraído: {nutrient_name} = {nutrient_value}")
-            if 'FIBRAS (g)' not in nutritional_data:
-                nutritional_data['FIBRAS (g)'] = '0 g'
-                self.logger.info("Fibra Alimentar não encontrada, definindo como 0 g")
-            return nutritional_data
+            self.logger.debug("Acessando página: %s", url, extra={'url': url})
+            content = self.fetch_page(url)
+            return self.parse_html(content, url)
         except Exception as e:
-            self.logger.error(f"Erro ao extrair dados nutricionais: {e}")
-            return nutritional_data
+            self.logger.error("Erro ao carregar página %s: %s", url, e, extra={'url': url})
+            return None
     
     def clean_nutritional_value(self, value: str, field: str = "") -> str:
         """
@@ -157,21 +254,24 @@ class PerdigaoScraper:
             Valor limpo (ex: "236", "19", "500")
         """
         try:
-            value = value.strip()
-            # Se for calorias, pegar só o valor antes de qualquer símbolo separador
-            if field == 'CALORIAS (kcal)':
-                # Pega só o que vem antes de qualquer símbolo separador
-                value = re.split(r'[=\\/|&%#]', value)[0].strip()
-            # Extrair apenas o primeiro número (com vírgula ou ponto)
-            match = re.search(r'([\d,\.]+)', value)
-            if match:
-                cleaned = match.group(1).replace(',', '.')
-                return cleaned
-            return "0"
+            return extractor.clean_nutritional_value(value, field)
         except Exception as e:
-            self.logger.error(f"Erro ao limpar valor nutricional '{value}': {e}")
+            self.logger.error("Erro ao limpar valor nutricional '%s': %s", value, e)
             return "0"
     
+    def extract_product_data(self, soup: BeautifulSoup):
+        """
+        Extrai nome, porção e dados nutricionais em uma única passagem pelo documento
+        
+        Returns:
+            Tupla (nome, porção, dados nutricionais brutos)
+        """
+        try:
+            return extract_product(soup, self.nutricional_mapping, self.logger)
+        except Exception as e:
+            self.logger.error("Erro ao extrair dados do produto: %s", e)
+            return "Nome não encontrado", "100g", {}
+    
     def scrape_product(self, url: str) -> Optional[Dict]:
         """
         Faz scraping completo de um produto
@@ -182,125 +282,329 @@ class PerdigaoScraper:
         Returns:
             Dicionário com todos os dados do produto ou None se houver erro
         """
-        self.logger.info(f"Iniciando scraping do produto: {url}")
+        self.logger.debug("Iniciando scraping do produto: %s", url, extra={'url': url})
         
         # Obter conteúdo da página
         soup = self.get_page_content(url)
         if not soup:
             return None
         
-        # Extrair dados básicos
-        product_name = self.extract_product_name(soup)
-        porcao = self.extract_porcao(soup)
-        
-        # Extrair dados nutricionais
-        nutritional_data = self.extract_nutritional_data(soup)
-        
-        # Criar dicionário com todos os dados
-        product_data = {
-            'NOME_PRODUTO': product_name,
-            'URL': url,
-            'PORCAO (g)': porcao.replace('g', ''),  # Remover 'g' da porção
-        }
-        
-        # Adicionar dados nutricionais limpos
-        for field, value in nutritional_data.items():
-            cleaned_value = self.clean_nutritional_value(value, field)
-            product_data[field] = cleaned_value
-        
-        # Garantir que todos os campos existam
-        required_fields = [
-            'CALORIAS (kcal)', 'CARBOIDRATOS (g)', 'PROTEINAS (g)',
-            'GORDURAS_TOTAIS (g)', 'GORDURAS_SATURADAS (g)', 'FIBRAS (g)',
-            'ACUCARES (g)', 'SODIO (mg)'
-        ]
-        
-        for field in required_fields:
-            if field not in product_data:
-                product_data[field] = "0"
-                self.logger.warning(f"Campo {field} não encontrado, definindo como 0")
-        
-        self.logger.info(f"Scraping concluído para: {product_name}")
+        # Extrair nome, porção e dados nutricionais (passagem única)
+        inicio = time.perf_counter()
+        product_name, porcao, nutritional_data = self.extract_product_data(soup)
+        self.metrics.record(url, 'extract', time.perf_counter() - inicio)
+        
+        if self.clean_mode == 'batch':
+            # Textos brutos: a limpeza é feita depois, em lote
+            product_data = build_raw_row(url, product_name, porcao, nutritional_data)
+        else:
+            # Criar dicionário com valores limpos e todos os campos obrigatórios
+            inicio = time.perf_counter()
+            product_data = build_product_row(url, product_name, porcao, nutritional_data, self.logger)
+            self.metrics.record(url, 'clean', time.perf_counter() - inicio)
+        
+        self.logger.debug("Scraping concluído para: %s", product_name, extra={'url': url})
         return product_data
     
-    def scrape_products(self, urls: List[str]) -> pd.DataFrame:
+    def clean_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Limpeza em lote (clean_nutritional_frame) com o tempo registrado nas métricas"""
+        inicio = time.perf_counter()
+        df = clean_nutritional_frame(df, self.logger)
+        self.metrics.record_batch('clean', time.perf_counter() - inicio, len(df))
+        return df
+    
+    def scrape_products(self, urls: Iterable[str], writer: Optional[StreamingWriter] = None,
+                        return_dataframe: bool = True,
+                        journal: Optional[RunJournal] = None,
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> Optional[pd.DataFrame]:
         """
         Faz scraping de múltiplos produtos e retorna um DataFrame
         
         Args:
-            urls: Lista de URLs dos produtos
+            urls: URLs dos produtos; pode ser um gerador (ex: url_collector.iter_product_urls),
+                  e cada URL entra na fila de trabalho assim que é produzida
+            writer: StreamingWriter que recebe cada linha assim que é extraída (opcional)
+            return_dataframe: Monta e retorna o DataFrame ao final; com False (e um writer)
+                              as linhas não são mantidas em memória
+            journal: Diário de execução onde cada URL concluída ou com falha é registrada
+            on_progress: Chamada como on_progress(concluídas, total) a cada URL terminada
+                         (com ou sem sucesso), de qualquer thread; com um gerador, o
+                         total é o número de URLs recebidas até o momento
             
         Returns:
-            DataFrame com todos os dados
+            DataFrame com todos os dados, ou None se return_dataframe for False
         """
+        # Com um gerador o total só é conhecido no fim: `seen` guarda as URLs recebidas
+        total = len(urls) if hasattr(urls, '__len__') else None
+        seen: List[str] = []
         all_products = []
+        start = time.monotonic()
+        first_row_s: Optional[float] = None
         
-        for i, url in enumerate(urls, 1):
-            self.logger.info(f"Processando produto {i}/{len(urls)}")
-            
-            product_data = self.scrape_product(url)
-            if product_data:
-                all_products.append(product_data)
-            else:
-                self.logger.error(f"Falha ao processar produto: {url}")
+        # As linhas são publicadas na ordem das URLs de entrada: resultados que chegam
+        # adiantados esperam em `pending` até que os anteriores terminem
+        pending: Dict[int, Optional[Dict]] = {}
+        next_index = 0
+        failed = 0
+        done = 0
+        emit_lock = threading.Lock()
+        
+        def track(urls: Iterable[str]) -> Iterator[str]:
+            for url in urls:
+                seen.append(url)
+                yield url
+        
+        def emit(index: int, product_data: Optional[Dict]):
+            nonlocal next_index, failed, done, first_row_s
+            url = seen[index]
+            if not product_data:
+                self.logger.error("Falha ao processar produto: %s", url, extra={'url': url})
+            if journal is not None:
+                if product_data:
+                    journal.record_done(url, product_data)
+                else:
+                    journal.record_failed(url)
+            with emit_lock:
+                if not product_data:
+                    failed += 1
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, total or len(seen))
+                pending[index] = product_data
+                while next_index in pending:
+                    row = pending.pop(next_index)
+                    next_index += 1
+                    if not row:
+                        continue
+                    if first_row_s is None:
+                        first_row_s = time.monotonic() - start
+                    if writer is not None:
+                        writer.write(row)
+                    if return_dataframe:
+                        all_products.append(row)
+        
+        def process(index: int, url: str):
+            self.logger.debug("Processando produto %d/%s", index + 1, total or '?', extra={'url': url})
+            emit(index, self.scrape_product(url))
+        
+        tracked = track(urls)
+        if self.parse_workers > 0 and total != 1 and total != 0:
+            # Pipeline: downloads em threads, parsing em um pool de processos
+            self.logger.info("Modo pipeline: %d downloads, %d processos de parsing",
+                             self.max_workers, self.parse_workers)
+            pipeline = ScrapePipeline(self, fetch_workers=self.max_workers, parse_workers=self.parse_workers)
+            pipeline.run(tracked, on_result=emit)
+        elif self.max_workers > 1 and total != 1 and total != 0:
+            # Modo concorrente: os resultados mantêm a ordem das URLs de entrada
+            self.logger.info("Modo concorrente: %d workers, até %d requisições por host",
+                             self.max_workers, self.max_per_host)
+            # map envia cada URL ao pool assim que o gerador a produz
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(process, itertools.count(), tracked))
+        else:
+            for index, url in enumerate(tracked):
+                process(index, url)
+        
+        if writer is not None:
+            writer.flush()
+        self.logger.info(format_connection_stats())
+        self.logger.info(self.format_parse_stats())
+        if self.cache:
+            self.logger.info(self.cache.format_stats())
+        if self.limiter is not None:
+            self.logger.info(self.limiter.format_stats())
+        if not self.replay:
+            self.logger.info(self.retrier.format_stats())
+        self.logger.info(self.metrics.format_stats())
+        total = len(seen)
+        if first_row_s is not None:
+            self.logger.info("Primeira linha em %.2fs | total %.2fs", first_row_s, time.monotonic() - start)
+        self.logger.info("Produtos extraídos: %d de %d | com falha: %d", total - failed, total, failed)
+        # Avisos repetidos (ex: campos ausentes) saíram uma vez no log; aqui vai o total de cada um
+        log_setup.log_repeat_summary(self.logger)
+        
+        if not return_dataframe:
+            return None
         
         # Criar DataFrame
         df = pd.DataFrame(all_products)
+        if self.clean_mode == 'batch' and not df.empty:
+            df = self.clean_frame(df)
         
-        # Ordenar colunas na ordem especificada
-        column_order = [
-            'NOME_PRODUTO', 'URL', 'PORCAO (g)',
-            'CALORIAS (kcal)', 'CARBOIDRATOS (g)', 'PROTEINAS (g)',
-            'GORDURAS_TOTAIS (g)', 'GORDURAS_SATURADAS (g)', 'FIBRAS (g)',
-            'ACUCARES (g)', 'SODIO (mg)'
-        ]
-        
-        # Reordenar colunas (apenas as que existem)
-        existing_columns = [col for col in column_order if col in df.columns]
+        # Ordenar colunas na ordem especificada (apenas as que existem)
+        existing_columns = [col for col in COLUMN_ORDER if col in df.columns]
         df = df[existing_columns]
         
         return df
     
-    def save_dataframe(self, df: pd.DataFrame, filename: str = None) -> str:
+    def save_dataframe(self, df: pd.DataFrame, filename: str = None, fmt: str = 'csv',
+                       compression: str = DEFAULT_COMPRESSION) -> str:
         """
-        Salva o DataFrame em arquivo CSV
+        Salva o DataFrame em arquivo CSV, Parquet ou Feather (Arrow)
         
         Args:
             df: DataFrame para salvar
             filename: Nome do arquivo (opcional)
+            fmt: 'csv' (texto, como extraído), 'parquet' ou 'feather' (esquema tipado)
+            compression: Codec de compressão dos formatos colunares
             
         Returns:
             Caminho do arquivo salvo
         """
+        extension = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}.get(fmt)
+        if extension is None:
+            self.logger.error("Formato inválido: %s", fmt)
+            return ""
+        
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"produtos_perdigao_{timestamp}.csv"
+            filename = f"produtos_perdigao_{timestamp}{extension}"
         
-        # Garantir que o arquivo tenha extensão .csv
-        if filename and not filename.endswith('.csv'):
-            filename += '.csv'
+        # Garantir que o arquivo tenha a extensão do formato
+        if filename and not filename.endswith(extension):
+            filename += extension
         
         # Salvar na pasta dados
         dados_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dados')
         os.makedirs(dados_dir, exist_ok=True)
         
-        final_filename = filename if filename else "produto.csv"
+        final_filename = filename if filename else f"produto{extension}"
         filepath = os.path.join(dados_dir, final_filename)
         
         try:
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            self.logger.info(f"DataFrame salvo em: {filepath}")
-            self.logger.info(f"Total de produtos: {len(df)}")
+            if fmt == 'csv':
+                df.to_csv(filepath, index=False, encoding='utf-8')
+            else:
+                save_columnar(df, filepath, compression=compression)
+            self.logger.info("DataFrame salvo em: %s", filepath)
+            self.logger.info("Total de produtos: %d", len(df))
             return filepath
             
+        except ImportError:
+            self.logger.error("Saída Parquet/Feather requer o pyarrow (pip install pyarrow)")
+            return ""
         except Exception as e:
-            self.logger.error(f"Erro ao salvar DataFrame: {e}")
+            self.logger.error("Erro ao salvar DataFrame: %s", e)
             return ""
 
 
-def main():
-    """Função principal para teste"""
-    scraper = PerdigaoScraper()
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lê os argumentos de linha de comando do scraper"""
+    parser = argparse.ArgumentParser(description="Scraper de dados nutricionais da Perdigão")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="Número de requisições em paralelo (1 = sequencial)")
+    parser.add_argument('--max-per-host', type=int, default=4,
+                        help="Máximo de requisições simultâneas por host")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Ajusta as requisições simultâneas (até --workers) conforme latência, 429/503 e Retry-After")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="Novas tentativas para erros de conexão, 5xx e 429 (padrão: 2; 0 desativa)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Usa o cache HTTP em disco com GET condicional (ETag/Last-Modified)")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="Validade em segundos para páginas sem validadores (implica --cache)")
+    parser.add_argument('--archive', action='store_true',
+                        help="Grava cada resposta no arquivo comprimido de HTML (dados/archive)")
+    parser.add_argument('--replay', action='store_true',
+                        help="Reprocessa todo o catálogo a partir do arquivo de HTML, sem acessar a rede")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Processos de parsing do pipeline em estágios (0 = parsing junto com o download)")
+    parser.add_argument('--batch-clean', action='store_true',
+                        help="Limpa os valores nutricionais em lote (vetorizado) em vez de um a um")
+    parser.add_argument('--parser', default='auto',
+                        help="Backend de parsing: auto, html.parser, lxml ou html5lib")
+    parser.add_argument('--full-parse', action='store_true',
+                        help="Constrói a árvore HTML completa em vez de só os nós usados pelos extratores")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv',
+                        help="Formato do arquivo de saída, gravado linha a linha durante a execução")
+    parser.add_argument('--columnar', choices=['parquet', 'feather'], default=None,
+                        help="Salva também uma cópia tipada em Parquet ou Feather (Arrow), requer pyarrow")
+    parser.add_argument('--resume', action='store_true',
+                        help="Retoma a última execução interrompida, pulando as URLs já concluídas")
+    parser.add_argument('--delta', action='store_true',
+                        help="Gera também o delta (adicionados/removidos/alterados) em relação ao CSV anterior")
+    parser.add_argument('--fused', action='store_true',
+                        help="Coleta as URLs e extrai os produtos ao mesmo tempo: cada produto descoberto "
+                             "entra direto na fila do scraper (dados/product_urls.json é gravado ao final)")
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help="Nível mínimo do log (DEBUG inclui as linhas de cada produto)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Gera o perfil de CPU (cProfile e pilhas para flamegraph) e de memória "
+                             "(tracemalloc) de cada etapa em dados/profiles/<nome do CSV>/")
+    parser.add_argument('--changed', action='store_true',
+                        help="Extrai só as URLs alteradas separadas pelo url_collector.py --sitemap "
+                             "--incremental/--changed-since (dados/sitemap/changed_urls.json)")
+    args = parser.parse_args(argv)
+    if args.changed and (args.delta or args.fused or args.replay):
+        # O delta compara catálogos completos: com um subconjunto, o resto apareceria como removido
+        parser.error("--changed não pode ser usado com --delta, --fused ou --replay")
+    return args
+
+
+def stream_discovered_urls(journal: RunJournal, discovered: List[str], scraper: PerdigaoScraper,
+                           metrics: Optional[RunMetrics] = None,
+                           discovery: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Gera as URLs de produtos conforme o crawler as descobre, registrando cada
+    uma no diário (para --resume) e em `discovered` (para o product_urls.json)
+    
+    Ao retomar, a descoberta recomeça do zero: URLs já concluídas no diário
+    entram em `discovered` mas não voltam para a fila. discovery['complete']
+    só vira True quando o crawler termina de percorrer o catálogo
+    """
+    for url in url_collector.iter_product_urls(limiter=scraper.limiter, retrier=scraper.retrier,
+                                               metrics=metrics):
+        discovered.append(url)
+        journal.record_url(url)
+        if url not in journal.completed:
+            yield url
+    if discovery is not None:
+        discovery['complete'] = True
+
+
+def save_delta_snapshot(filepath: str, timestamp: str):
+    """Compara o snapshot salvo com o anterior e grava o delta e o changelog"""
+    previous_path = delta.find_previous_snapshot(exclude=filepath)
+    if not previous_path:
+        print("ℹ️  Nenhum snapshot anterior encontrado, delta não gerado")
+        return
+    
+    changes = delta.compute_delta(delta.load_snapshot(previous_path), delta.load_snapshot(filepath))
+    paths = delta.save_delta(changes, previous_path, filepath, timestamp=timestamp)
+    print(f"🔀 Delta em relação a {os.path.basename(previous_path)}: "
+          f"{len(changes['added'])} adicionados, {len(changes['removed'])} removidos, "
+          f"{len(changes['changed'])} alterados")
+    print(f"   📄 {paths['csv']}")
+    print(f"   📄 {paths['changelog']}")
+
+
+def main(argv: Optional[List[str]] = None,
+         on_progress: Optional[Callable[[int, int], None]] = None) -> Optional[str]:
+    """
+    Executa a extração completa (também chamada em processo pelo main.py)
+    
+    Args:
+        argv: Argumentos de linha de comando (None = sys.argv)
+        on_progress: Chamada como on_progress(concluídas, total) a cada URL terminada
+    
+    Returns:
+        Caminho do arquivo gerado, ou None se nada foi extraído
+    """
+    args = parse_args(argv)
+    # Cada execução começa um arquivo de log novo (o anterior vira .1, .2, ...)
+    log_setup.setup_logging(level=args.log_level)
+    log_setup.start_run()
+    cache = HTTPCache(ttl=args.cache_ttl) if args.cache or args.cache_ttl is not None else None
+    archive = HTMLArchive() if args.archive or args.replay else None
+    # No modo adaptativo o controlador decide a concorrência; --workers é só o teto
+    limiter = get_shared_limiter(max_limit=args.workers) if args.adaptive else None
+    max_per_host = args.workers if args.adaptive else args.max_per_host
+    scraper = PerdigaoScraper(max_workers=args.workers, max_per_host=max_per_host, cache=cache,
+                              archive=archive, replay=args.replay,
+                              parser=args.parser, targeted=not args.full_parse,
+                              parse_workers=args.parse_workers,
+                              clean_mode='batch' if args.batch_clean else 'row',
+                              limiter=limiter, retrier=Retrier(max_attempts=args.retries + 1))
     
     # Caminho para o arquivo JSON com as URLs
     json_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dados', 'product_urls.json')
@@ -308,43 +612,148 @@ def main():
     print("🦆 SCRAPER PERDIGÃO - DADOS NUTRICIONAIS")
     print("=" * 50)
     
-    # Verificar se o arquivo JSON existe
-    if not os.path.exists(json_file):
-        print(f"❌ Arquivo não encontrado: {json_file}")
-        print("Execute primeiro o url_collector.py para gerar a lista de URLs")
-        return
+    journal = RunJournal.find_unfinished() if args.resume else None
+    if args.resume and journal is None:
+        print("ℹ️  Nenhuma execução interrompida encontrada, iniciando uma nova")
     
-    # Carregar URLs do JSON
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            urls = json.load(f)
-        print(f"📋 Carregadas {len(urls)} URLs do arquivo: {json_file}")
-    except Exception as e:
-        print(f"❌ Erro ao carregar URLs do JSON: {e}")
-        return
+    # No modo fundido as URLs vêm do crawler durante a extração, não do JSON
+    fused_urls: Optional[List[str]] = None
+    collector_metrics: Optional[RunMetrics] = None
+    # Subconjunto alterado do sitemap, confirmado (commit_changed) só ao final da extração
+    changed = sitemap.load_changed() if args.changed else None
+    if journal is not None:
+        # Retomada: mesmas URLs e mesmo arquivo de saída da execução interrompida
+        urls = journal.urls
+        filepath = journal.output
+        timestamp = os.path.splitext(os.path.basename(filepath))[0].replace('produtos_perdigao_', '')
+        print(f"♻️  Retomando execução: {journal.summary()}")
+        if journal.fused:
+            # O diário só tem as URLs descobertas até a interrupção: o crawler percorre o catálogo de novo
+            fused_urls = []
+            collector_metrics = RunMetrics('coletor')
+            print("🔀 Execução no modo fundido: refazendo a descoberta e pulando os produtos já concluídos")
+    else:
+        if args.replay:
+            # Replay: o catálogo vem inteiro do arquivo de HTML, na ordem do product_urls.json
+            # (o arquivo guarda as páginas na ordem em que os downloads terminaram)
+            catalog = None
+            if os.path.exists(json_file):
+                try:
+                    with open(json_file, 'r', encoding='utf-8') as f:
+                        catalog = json.load(f)
+                except Exception as e:
+                    print(f"⚠️  Erro ao carregar {json_file}, usando a ordem do arquivo de HTML: {e}")
+            urls = archive.urls(order=catalog)
+            print(f"📦 Replay de {len(urls)} páginas do arquivo: {archive.data_path}")
+            if not urls:
+                print("❌ Arquivo de HTML vazio. Execute o scraper com --archive primeiro")
+                return None
+        elif args.changed:
+            if changed is None:
+                print(f"❌ Nenhuma lista de URLs alteradas em {sitemap.CHANGED_PATH}")
+                print("Execute primeiro o url_collector.py --sitemap --incremental (ou --changed-since)")
+                return None
+            urls = changed['urls']
+            if not urls:
+                print("ℹ️  Nenhum produto alterado desde a última extração")
+                sitemap.commit_changed(changed)
+                return None
+            print(f"📋 {len(urls)} URLs alteradas de {changed['sitemap_url']}")
+        elif args.fused:
+            urls = []
+            fused_urls = []
+            collector_metrics = RunMetrics('coletor')
+            print("🔀 Modo fundido: cada produto descoberto pelo coletor entra direto na fila do scraper")
+        else:
+            # Verificar se o arquivo JSON existe
+            if not os.path.exists(json_file):
+                print(f"❌ Arquivo não encontrado: {json_file}")
+                print("Execute primeiro o url_collector.py para gerar a lista de URLs")
+                return None
+            
+            # Carregar URLs do JSON
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    urls = json.load(f)
+                print(f"📋 Carregadas {len(urls)} URLs do arquivo: {json_file}")
+            except Exception as e:
+                print(f"❌ Erro ao carregar URLs do JSON: {e}")
+                return None
+            
+            if not urls:
+                print("❌ Nenhuma URL encontrada no arquivo JSON")
+                return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(DADOS_DIR, f"produtos_perdigao_{timestamp}.{args.format}")
+        journal = RunJournal.create(filepath, urls, fused=fused_urls is not None)
     
-    if not urls:
-        print("❌ Nenhuma URL encontrada no arquivo JSON")
-        return
+    # Fazer scraping dos produtos pendentes, gravando cada linha assim que é extraída
+    fmt = 'jsonl' if filepath.endswith('.jsonl') else 'csv'
+    # A limpeza é idempotente: ao retomar, aplicá-la cobre linhas brutas gravadas no
+    # diário por uma execução anterior com --batch-clean
+    transform = scraper.clean_frame if args.batch_clean or journal.completed else None
+    profiler = RunProfiler(os.path.splitext(os.path.basename(filepath))[0]) if args.profile else None
+    discovery = {'complete': False}
+    with profile_stage(profiler, 'scraping'), \
+            StreamingWriter(filepath, fmt=fmt, batch_size=500 if args.batch_clean else 20,
+                            transform=transform) as writer:
+        # Resultados parciais da execução interrompida entram primeiro
+        for row in journal.completed_rows():
+            writer.write(row)
+        if fused_urls is not None:
+            pending = stream_discovered_urls(journal, fused_urls, scraper, collector_metrics, discovery)
+        else:
+            pending = journal.pending_urls()
+        scraper.scrape_products(pending, writer=writer, return_dataframe=False, journal=journal,
+                                on_progress=on_progress)
+    if fused_urls is not None and not discovery['complete']:
+        # Descoberta interrompida (ex: erro no crawler): o catálogo ficaria pela
+        # metade, então o diário é mantido para o --resume refazê-la
+        journal.close()
+        print(f"\n❌ A descoberta de URLs não terminou; execute novamente com --resume ({journal.summary()})")
+        return None
+    if not writer.rows_written and not journal.failed:
+        # Nada extraído: a saída é removida antes do diário, que nunca fica apontando para um arquivo apagado
+        os.remove(filepath)
+    if not journal.finish():
+        # URLs com falha (ex: rede instável) ficam no diário; a saída também fica, e é regravada ao retomar
+        print(f"⚠️  {len(journal.failed)} URLs com falha mantidas em {journal.path}; "
+              f"execute novamente com --resume para tentá-las de novo")
+    if changed is not None and all(url in journal.completed for url in changed['urls']):
+        # Só agora a descoberta incremental avança; com falhas, as alterações ficam para a próxima
+        sitemap.commit_changed(changed)
+    elif changed is not None:
+        print(f"⚠️  Nem todas as URLs alteradas foram extraídas: {sitemap.CHANGED_PATH} mantido")
+    if fused_urls:
+        # Saída lateral: a mesma lista que o url_collector.py gravaria
+        url_collector.save_urls_to_json(fused_urls, url_collector.URLS_PATH)
     
-    # Fazer scraping de todos os produtos
-    df = scraper.scrape_products(urls)
+    # Relatório de tempos por fase (JSON da execução + textfile do Prometheus)
+    for metrics in filter(None, [scraper.metrics, collector_metrics]):
+        paths = metrics.export(timestamp)
+        print(f"⏱️  {metrics.format_stats()}")
+        print(f"   📄 {paths['json']} | {paths['prometheus']}")
     
-    if not df.empty:
+    if writer.rows_written:
         print("\n✅ Dados extraídos com sucesso!")
-        print(f"\n📊 Total de produtos processados: {len(df)}")
-        
-        # Salvar com timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"produtos_perdigao_{timestamp}.csv"
-        filepath = scraper.save_dataframe(df, filename)
-        
-        if filepath:
-            print(f"\n💾 Arquivo salvo em: {filepath}")
-        else:
-            print("\n❌ Erro ao salvar arquivo")
-    else:
-        print("\n❌ Falha ao extrair dados dos produtos")
+        print(f"\n📊 Total de produtos processados: {writer.rows_written}")
+        print(f"\n💾 Arquivo salvo em: {filepath}")
+        # Etapa de saída: DataFrame do snapshot para a cópia tipada e o delta
+        with profile_stage(profiler if args.columnar or args.delta else None, 'saida'):
+            if args.columnar:
+                columnar_path = scraper.save_dataframe(delta.load_snapshot(filepath),
+                                                       f"produtos_perdigao_{timestamp}", fmt=args.columnar)
+                if columnar_path:
+                    print(f"💾 Cópia tipada ({args.columnar}) salva em: {columnar_path}")
+                else:
+                    print(f"❌ Erro ao salvar cópia {args.columnar} (veja o log)")
+            if args.delta:
+                save_delta_snapshot(filepath, timestamp)
+        return filepath
+    
+    print("\n❌ Falha ao extrair dados dos produtos")
+    return None
 
 
 if __name__ == "__main__":
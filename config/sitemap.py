@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Descoberta de URLs de produtos pelo sitemap.xml
+Lê sitemaps e índices de sitemaps com parsing XML em streaming (iterparse),
+com memória constante mesmo em arquivos grandes, e usa o <lastmod> para
+separar as URLs alteradas desde a última execução. O catálogo completo
+continua indo para product_urls.json; o subconjunto alterado fica pendente
+em dados/sitemap/ até o scraper (--changed) terminar de extraí-lo
+"""
+
+import gzip
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import http_client
+from retry import Retrier
+from url_classifier import PRODUCT, URLClassifier
+
+
+DADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados')
+# Fora da raiz de dados/, onde o main.py lista os .json como listas de URLs
+SITEMAP_DIR = os.path.join(DADOS_DIR, 'sitemap')
+STATE_PATH = os.path.join(SITEMAP_DIR, 'state.json')
+# URLs alteradas da última descoberta, aguardando o scraper (scraper.py --changed)
+CHANGED_PATH = os.path.join(SITEMAP_DIR, 'changed_urls.json')
+
+# Índices de sitemap aninhados além disso são ignorados (proteção contra ciclos)
+MAX_INDEX_DEPTH = 3
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Converte o <lastmod> (formato W3C: '2025-07-12' ou '2025-07-12T21:34:11+00:00')
+    em datetime com fuso (UTC quando ausente)
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def iter_sitemap_entries(stream: IO[bytes]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Percorre um sitemap em streaming
+
+    Cada <url> ou <sitemap> é liberado da árvore assim que lido, então a
+    memória não cresce com o tamanho do arquivo
+
+    Args:
+        stream: Arquivo binário com o XML
+
+    Yields:
+        (tipo, loc, lastmod) com tipo 'url' (página) ou 'sitemap' (item de um índice)
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            continue
+        kind = element.tag.rsplit('}', 1)[-1]
+        if kind not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in element:
+            name = child.tag.rsplit('}', 1)[-1]
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = child.text
+        if loc:
+            yield kind, loc, lastmod
+        # Descarta o item já processado (e as referências a ele na raiz)
+        element.clear()
+        root.clear()
+
+
+class SitemapCrawler:
+    def __init__(self, since: Optional[datetime] = None, timeout: float = 30, cache=None,
+                 limiter=None, retrier: Optional[Retrier] = None):
+        """
+        Args:
+            since: URLs com <lastmod> posterior a esta data são marcadas como alteradas
+                   (None = todas)
+            timeout: Timeout de cada requisição de sitemap
+            cache: HTTPCache para GET condicional (opcional; o sitemap é lido da memória)
+            limiter: AdaptiveLimiter compartilhado (opcional)
+            retrier: Retentativas e disjuntor por host (padrão: Retrier() com 3 tentativas)
+        """
+        self.since = since
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter
+        self.retrier = retrier or Retrier()
+        self.stats = {'sitemaps': 0, 'urls': 0, 'changed': 0}
+
+    def _is_changed(self, lastmod: Optional[str]) -> bool:
+        if self.since is None:
+            return True
+        modified = parse_lastmod(lastmod)
+        # Sem <lastmod> não há como saber: a URL é mantida
+        if modified is None:
+            return True
+        if 'T' not in lastmod:
+            # Só a data (o formato mais comum) vira meia-noite: uma página alterada no mesmo
+            # dia da última extração, depois do início dela, nunca seria posterior a `since`
+            return modified.date() >= self.since.astimezone(timezone.utc).date()
+        return modified > self.since
+
+    def _open(self, url: str):
+        """
+        Requisita o sitemap pelo controlador adaptativo, pelas retentativas e pelo cache,
+        como as páginas de listagem do crawler
+
+        Returns:
+            (resposta, arquivo binário com o corpo): com o cache o corpo vem da memória;
+            sem ele, é lido direto do socket
+        """
+        def request():
+            with self.limiter.request() if self.limiter is not None else nullcontext() as ticket:
+                if self.cache:
+                    response = self.cache.fetch(http_client.get_session(), url, timeout=self.timeout)
+                else:
+                    response = http_client.get(url, timeout=self.timeout, stream=True)
+                    try:
+                        response.raise_for_status()
+                    except Exception:
+                        response.close()
+                        raise
+                if ticket is not None:
+                    ticket.observe(response)
+            return response
+
+        response = self.retrier.call(url, request)
+        if self.cache:
+            return response, io.BytesIO(response.content)
+        # Descomprime o Content-Encoding se houver
+        response.raw.decode_content = True
+        return response, response.raw
+
+    def iter_urls(self, sitemap_url: str, depth: int = 0) -> Iterator[Tuple[str, bool]]:
+        """
+        Percorre o sitemap (ou índice de sitemaps) inteiro
+
+        Todos os sitemaps filhos são lidos, mesmo os sem alteração: o catálogo
+        completo é necessário para o product_urls.json
+
+        Args:
+            sitemap_url: URL do sitemap.xml, sitemap.xml.gz ou índice
+            depth: Nível de aninhamento do índice atual
+
+        Yields:
+            (URL, alterada desde `since`)
+        """
+        response, stream = self._open(sitemap_url)
+        try:
+            self.stats['sitemaps'] += 1
+            if sitemap_url.endswith('.gz') or 'gzip' in response.headers.get('Content-Type', ''):
+                stream = gzip.GzipFile(fileobj=stream)
+
+            children = []
+            for kind, loc, lastmod in iter_sitemap_entries(stream):
+                if kind == 'sitemap':
+                    if depth < MAX_INDEX_DEPTH:
+                        # Só a URL é guardada; o filho é lido depois de fechar este
+                        children.append(urljoin(sitemap_url, loc))
+                    continue
+                self.stats['urls'] += 1
+                changed = self._is_changed(lastmod)
+                if changed:
+                    self.stats['changed'] += 1
+                yield loc, changed
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+
+        for child in children:
+            yield from self.iter_urls(child, depth + 1)
+
+    def format_stats(self) -> str:
+        since = self.since.isoformat(timespec='seconds') if self.since else 'sempre'
+        return (f"Sitemap: {self.stats['sitemaps']} arquivos lidos | {self.stats['urls']} URLs | "
+                f"{self.stats['changed']} alteradas desde {since}")
+
+
+def load_last_run(sitemap_url: str, state_path: str = STATE_PATH) -> Optional[datetime]:
+    """Data da última descoberta concluída para este sitemap, ou None"""
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r', encoding='utf-8') as f:
+        state: Dict[str, str] = json.load(f)
+    return parse_lastmod(state.get(sitemap_url))
+
+
+def save_last_run(sitemap_url: str, started_at: datetime, state_path: str = STATE_PATH):
+    """Registra o início da descoberta concluída (a próxima pega o que mudou a partir daí)"""
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    state[sitemap_url] = started_at.isoformat(timespec='seconds')
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+
+def save_changed(sitemap_url: str, started_at: datetime, urls: List[str], incremental: bool,
+                 path: str = CHANGED_PATH):
+    """Grava o subconjunto alterado, pendente até o scraper extraí-lo (ver commit_changed)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    pending = {'sitemap_url': sitemap_url, 'started_at': started_at.isoformat(timespec='seconds'),
+               'incremental': incremental, 'urls': urls}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(pending, f, indent=2, ensure_ascii=False)
+
+
+def load_changed(path: str = CHANGED_PATH) -> Optional[Dict]:
+    """Subconjunto alterado pendente ({'sitemap_url', 'started_at', 'incremental', 'urls'}), ou None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def commit_changed(pending: Dict, state_path: str = STATE_PATH, path: str = CHANGED_PATH):
+    """
+    Chamada depois que o scraper extraiu todo o subconjunto: só então a descoberta
+    incremental avança a data registrada, e o arquivo pendente é removido
+
+    Uma interrupção antes disso mantém as alterações para a próxima execução
+    """
+    if pending.get('incremental'):
+        save_last_run(pending['sitemap_url'], parse_lastmod(pending['started_at']), state_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def discover_product_urls(sitemap_url: str, base_url: str, since: Optional[datetime] = None,
+                          incremental: bool = False, cache=None, limiter=None,
+                          retrier: Optional[Retrier] = None) -> Tuple[List[str], List[str]]:
+    """
+    Descobre as URLs de produtos pelo sitemap
+
+    Com `since` ou `incremental`, o subconjunto alterado é gravado em CHANGED_PATH
+    para o scraper (--changed); a data da descoberta incremental só avança quando
+    esse subconjunto é extraído (commit_changed)
+
+    Args:
+        sitemap_url: URL do sitemap ou índice de sitemaps
+        base_url: Raiz do site (para classificar e normalizar as URLs)
+        since: Só URLs alteradas depois desta data entram no subconjunto
+        incremental: Usa como `since` a data da última extração incremental concluída
+        cache, limiter, retrier: Como no SitemapCrawler
+
+    Returns:
+        (catálogo completo, URLs alteradas), ambos normalizados, sem duplicatas
+        e na ordem do sitemap
+    """
+    started_at = datetime.now(timezone.utc)
+    if incremental and since is None:
+        since = load_last_run(sitemap_url)
+        print(f"🕒 Última extração incremental: {since.isoformat(timespec='seconds') if since else 'nenhuma (lista completa)'}")
+
+    crawler = SitemapCrawler(since=since, cache=cache, limiter=limiter, retrier=retrier)
+    classifier = URLClassifier(base_url)
+    catalog: Dict[str, bool] = {}
+    for url, changed in crawler.iter_urls(sitemap_url):
+        label, canonical = classifier.analyze(url)
+        if label == PRODUCT:
+            catalog[canonical] = catalog.get(canonical, False) or changed
+    print(crawler.format_stats())
+    print(crawler.retrier.format_stats())
+
+    urls = list(catalog)
+    changed_urls = [url for url, changed in catalog.items() if changed]
+    if incremental or since is not None:
+        save_changed(sitemap_url, started_at, changed_urls, incremental)
+    return urls, changed_urls
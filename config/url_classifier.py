@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classificação de URLs do catálogo da Perdigão
+Rotula cada URL como seção, subcategoria ou produto pela profundidade do
+caminho sob /produtos/ (/produtos/<seção>/<subcategoria>/<produto>), no
+lugar da lista de URLs excluídas mantida à mão. A consulta é O(1) por URL:
+normalização, um conjunto de hosts aceitos e uma trie de regras explícitas
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+ROOT = 'raiz'
+SECTION = 'secao'
+SUBCATEGORY = 'subcategoria'
+PRODUCT = 'produto'
+OTHER = 'outro'
+
+# Rótulo por número de segmentos abaixo de /produtos/
+DEPTH_LABELS = {0: ROOT, 1: SECTION, 2: SUBCATEGORY, 3: PRODUCT}
+
+# Segmento de caminho do catálogo: qualquer coisa entre barras (o caminho já vem sem query e
+# fragmento), como o filtro por lista de exclusão original; restringir a slugs [a-z0-9-]
+# descartaria em silêncio produtos com '_', '.', %-encoding ou acentos
+SEGMENT = r'[^/]+'
+DUPLICATE_SLASHES = re.compile(r'/{2,}')
+
+# Esquema, host e caminho em uma única busca (mais barato que urlsplit em volume)
+URL_PARTS = re.compile(r'^(?:([a-zA-Z][a-zA-Z0-9+.-]*):)?(?://([^/?#]*))?([^?#]*)')
+
+
+class PathTrie:
+    """Trie de segmentos de caminho com rótulos; a busca devolve o rótulo do prefixo mais longo"""
+
+    def __init__(self):
+        self._root: Dict = {}
+        self.has_rules = False
+
+    def insert(self, path: str, label: str):
+        self.has_rules = True
+        node = self._root
+        for segment in path.strip('/').split('/'):
+            node = node.setdefault(segment, {})
+        node[None] = label
+
+    def lookup(self, segments: List[str]) -> Optional[str]:
+        node = self._root
+        label = node.get(None)
+        for segment in segments:
+            node = node.get(segment)
+            if node is None:
+                break
+            label = node.get(None, label)
+        return label
+
+
+class URLClassifier:
+    def __init__(self, base_url: str = 'https://www.perdigao.com.br/', catalog_root: str = 'produtos',
+                 overrides: Optional[Dict[str, str]] = None):
+        """
+        Configura o classificador
+
+        Args:
+            base_url: Raiz do site; links relativos são resolvidos contra ela e só o
+                      host dela (com ou sem www) é aceito
+            catalog_root: Primeiro segmento do caminho do catálogo
+            overrides: Regras explícitas {caminho: rótulo} que valem para o caminho e
+                       tudo abaixo dele (ex: {'produtos/receitas': 'outro'})
+        """
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.netloc.lower()
+        bare_host = self.host[4:] if self.host.startswith('www.') else self.host
+        self.hosts = frozenset({self.host, bare_host, f"www.{bare_host}"})
+        self.catalog_root = catalog_root
+        # Caminho inteiro do catálogo validado em uma única busca; o grupo traz os segmentos
+        self.catalog_pattern = re.compile(rf'^/*{re.escape(catalog_root)}((?:/+{SEGMENT})*)/*$')
+        self.overrides = PathTrie()
+        for path, label in (overrides or {}).items():
+            self.overrides.insert(path, label)
+
+    def analyze(self, url: str) -> Tuple[str, str]:
+        """Retorna (rótulo, URL canônica) com uma única decomposição da URL (para quem precisa dos dois)"""
+        scheme, host, path = URL_PARTS.match(url.strip()).groups()
+        host = (host or '').lower()
+        path = DUPLICATE_SLASHES.sub('/', '/' + path.lstrip('/')).rstrip('/')
+        if not host or host in self.hosts:
+            # Links relativos e o mesmo site com ou sem www: uma única forma canônica
+            canonical = f"{self.scheme}://{self.host}{path}"
+        else:
+            return OTHER, f"{(scheme or self.scheme).lower()}://{host}{path}"
+
+        match = self.catalog_pattern.match(path.lower())
+        if match is None:
+            return OTHER, canonical
+        below = match.group(1).split('/')[1:] if match.group(1) else []
+        if self.overrides.has_rules:
+            label = self.overrides.lookup([self.catalog_root] + below)
+            if label is not None:
+                return label, canonical
+        return DEPTH_LABELS.get(len(below), OTHER), canonical
+
+    def normalize(self, url: str) -> str:
+        """
+        Forma canônica da URL: esquema e host do site, sem query, fragmento,
+        barras duplicadas ou barra final
+
+        Ex: 'HTTPS://www.perdigao.com.br//produtos/frios/?p=2#x' -> 'https://www.perdigao.com.br/produtos/frios'
+        """
+        return self.analyze(url)[1]
+
+    def classify(self, url: str) -> str:
+        """
+        Rotula a URL como raiz, seção, subcategoria, produto ou outro
+
+        Args:
+            url: URL absoluta do site ou caminho relativo ('produtos/frios/presuntos')
+
+        Returns:
+            Um de ROOT, SECTION, SUBCATEGORY, PRODUCT ou OTHER
+        """
+        return self.analyze(url)[0]
+
+    def is_product(self, url: str) -> bool:
+        return self.classify(url) == PRODUCT
+
+    def filter_products(self, urls: Iterable[str]) -> List[str]:
+        """
+        Mantém só as URLs de produto, normalizadas e sem duplicatas, na ordem original
+        """
+        products = {}
+        for url in urls:
+            label, canonical = self.analyze(url)
+            if label == PRODUCT:
+                products[canonical] = None
+        return list(products)
@@ -1,103 +1,41 @@
-import requests
-from bs4 import BeautifulSoup
 import json
-import time
+import os
+import argparse
+from datetime import datetime
 from urllib.parse import urljoin
 
-def get_product_urls_from_section(section_url):
-    """
-    Coleta URLs de produtos de uma seção específica
-    """
-    try:
-        print(f"Acessando: {section_url}")
-        response = requests.get(section_url, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Procura por links de produtos (padrão: href="produtos/...")
-        product_links = []
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if href.startswith('produtos/') and '/produtos/' not in href:
-                # Constrói a URL completa
-                full_url = urljoin('https://www.perdigao.com.br/', href)
-                product_links.append(full_url)
-        
-        # Remove duplicatas mantendo a ordem
-        unique_links = list(dict.fromkeys(product_links))
-        print(f"Encontrados {len(unique_links)} links únicos")
-        
-        return unique_links
-        
-    except Exception as e:
-        print(f"Erro ao acessar {section_url}: {e}")
-        return []
+import http_client
+from crawler import BFSCrawler
+from http_cache import HTTPCache
+from html_archive import HTMLArchive
+from metrics import RunMetrics
+from profiling import RunProfiler, profile_stage
+from rate_control import get_shared_limiter
+from retry import Retrier
+from url_classifier import URLClassifier
+import sitemap
+
+# Raiz do site; PERDIGAO_BASE_URL aponta o coletor para outro endereço (ex: fake_site.py)
+BASE_URL = os.environ.get('PERDIGAO_BASE_URL', 'https://www.perdigao.com.br/')
 
-def filter_product_urls(all_urls):
+# Lista de URLs lida pelo scraper
+URLS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'product_urls.json')
+
+# Páginas de listagem baixadas em paralelo e orçamento de cortesia compartilhado (requisições/s)
+SECTION_WORKERS = 4
+SECTION_RATE = 2.0
+
+# Profundidade do crawl a partir de /produtos/ (seção = 1, subcategoria = 2, produto = 3)
+CRAWL_MAX_DEPTH = 3
+
+def filter_product_urls(all_urls, base_url=None):
     """
     Filtra URLs para manter apenas produtos individuais
+    Seções e subcategorias são reconhecidas pela profundidade do caminho
+    (/produtos/<seção>/<subcategoria>/<produto>), sem lista fixa de exclusões
     """
-    # URLs de seções, filtros e subcategorias para excluir
-    exclude_urls = [
-        'https://www.perdigao.com.br/produtos/',
-        'https://www.perdigao.com.br/produtos/empanados',
-        'https://www.perdigao.com.br/produtos/salsichas',
-        'https://www.perdigao.com.br/produtos/linguicas',
-        'https://www.perdigao.com.br/produtos/frios',
-        'https://www.perdigao.com.br/produtos/pratos-prontos',
-        'https://www.perdigao.com.br/produtos/lanches',
-        'https://www.perdigao.com.br/produtos/bacon',
-        'https://www.perdigao.com.br/produtos/suinos',
-        'https://www.perdigao.com.br/produtos/frango',
-        'https://www.perdigao.com.br/produtos/food-service',
-        'https://www.perdigao.com.br/produtos/comemorativos',
-        'https://www.perdigao.com.br/produtos/peru',
-        'https://www.perdigao.com.br/produtos/empanados/todos-os-empanados',
-        'https://www.perdigao.com.br/produtos/salsichas/todas-as-salsichas',
-        'https://www.perdigao.com.br/produtos/linguicas/todas-as-linguicas-defumadas',
-        'https://www.perdigao.com.br/produtos/linguicas/linguicas-frescais-recheadas',
-        'https://www.perdigao.com.br/produtos/linguicas/linguicas-frescais',
-        'https://www.perdigao.com.br/produtos/frios/mortadela-tradicional',
-        'https://www.perdigao.com.br/produtos/frios/presuntos',
-        'https://www.perdigao.com.br/produtos/frios/mortadela-ouro',
-        'https://www.perdigao.com.br/produtos/frios/salame',
-        'https://www.perdigao.com.br/produtos/frios/apresuntado',
-        'https://www.perdigao.com.br/produtos/frios/mortadela-tubular',
-        'https://www.perdigao.com.br/produtos/frios/lanche',
-        'https://www.perdigao.com.br/produtos/pratos-prontos/refeicao-individual',
-        'https://www.perdigao.com.br/produtos/pratos-prontos/pizzas',
-        'https://www.perdigao.com.br/produtos/pratos-prontos/lasanhas',
-        'https://www.perdigao.com.br/produtos/pratos-prontos/feijoada',
-        'https://www.perdigao.com.br/produtos/pratos-prontos/empanado-a-parmegiana',
-        'https://www.perdigao.com.br/produtos/lanches/pao-de-queijo',
-        'https://www.perdigao.com.br/produtos/lanches/hamburgueres',
-        'https://www.perdigao.com.br/produtos/bacon/cortes-de-bacon',
-        'https://www.perdigao.com.br/produtos/suinos/cortes-de-todos-os-suinos',
-        'https://www.perdigao.com.br/produtos/suinos/cortes-de-todos-os-suinos-temperados',
-        'https://www.perdigao.com.br/produtos/frango/produtos-in-natura-de-frango',
-        'https://www.perdigao.com.br/produtos/frango/produtos-in-natura-de-frango-temperados',
-        'https://www.perdigao.com.br/produtos/food-service/salsichas',
-        'https://www.perdigao.com.br/produtos/food-service/lanches',
-        'https://www.perdigao.com.br/produtos/food-service/linguicas',
-        'https://www.perdigao.com.br/produtos/food-service/frios',
-        'https://www.perdigao.com.br/produtos/food-service/cortes-suinos',
-        'https://www.perdigao.com.br/produtos/food-service/cortes-de-frango',
-        'https://www.perdigao.com.br/produtos/food-service/todos-itens-de-food-service',
-        'https://www.perdigao.com.br/produtos/comemorativos/pernil',
-        'https://www.perdigao.com.br/produtos/comemorativos/chester',
-        'https://www.perdigao.com.br/produtos/comemorativos/tender',
-        'https://www.perdigao.com.br/produtos/comemorativos/peru',
-        'https://www.perdigao.com.br/produtos/comemorativos/lombo',
-        'https://www.perdigao.com.br/produtos/comemorativos/frango',
-        'https://www.perdigao.com.br/produtos/peru/cortes-de-todos-os-perus'
-    ]
-    
-    # Filtra URLs
-    filtered_urls = []
-    for url in all_urls:
-        if url not in exclude_urls:
-            filtered_urls.append(url)
+    classifier = URLClassifier(base_url or BASE_URL)
+    filtered_urls = classifier.filter_products(all_urls)
     
     print(f"URLs antes do filtro: {len(all_urls)}")
     print(f"URLs após o filtro: {len(filtered_urls)}")
@@ -105,42 +43,62 @@ def filter_product_urls(all_urls):
     
     return filtered_urls
 
-def collect_all_product_urls():
+def iter_product_urls(cache=None, archive=None, base_url=None,
+                      workers=SECTION_WORKERS, rate=SECTION_RATE, limiter=None, retrier=None,
+                      max_depth=CRAWL_MAX_DEPTH, max_pages=None, depth_rates=None, visited='set',
+                      on_progress=None, metrics=None):
     """
-    Coleta URLs de produtos de todas as seções
+    Gera as URLs de produtos de todo o catálogo conforme o crawl as descobre
+    Um crawler em largura parte de /produtos/ e descobre seções e subcategorias
+    pelos links, sem lista fixa de seções. As páginas de cada nível são baixadas
+    em paralelo (workers) sob um orçamento de cortesia (rate requisições/s, ou
+    depth_rates por nível) e as URLs seguem a ordem de descoberta;
+    com um AdaptiveLimiter, a concorrência também se ajusta à resposta do site.
+    Erros transitórios são tentados de novo (padrão: Retrier() com 3 tentativas).
+    on_progress(baixadas, conhecidas) é chamada a cada página de listagem terminada
+    e os tempos por fase de cada página vão para `metrics` (RunMetrics), se informado.
+    Passado ao scraper, cada produto entra na fila de download enquanto o
+    restante do catálogo ainda está sendo percorrido (modo fundido)
     """
-    sections = {
-        'EMPANADOS': 'https://www.perdigao.com.br/produtos/empanados/',
-        'SALSICHAS': 'https://www.perdigao.com.br/produtos/salsichas/',
-        'LINGUIÇAS': 'https://www.perdigao.com.br/produtos/linguicas/',
-        'FRIOS': 'https://www.perdigao.com.br/produtos/frios/',
-        'PRATOS PRONTOS': 'https://www.perdigao.com.br/produtos/pratos-prontos/',
-        'LANCHES': 'https://www.perdigao.com.br/produtos/lanches/',
-        'BACON': 'https://www.perdigao.com.br/produtos/bacon/',
-        'SUINOS': 'https://www.perdigao.com.br/produtos/suinos/',
-        'FRANGO': 'https://www.perdigao.com.br/produtos/frango/',
-        'FOOD SERVICE': 'https://www.perdigao.com.br/produtos/food-service/',
-        'COMEMORATIVOS': 'https://www.perdigao.com.br/produtos/comemorativos/',
-        'PERU': 'https://www.perdigao.com.br/produtos/peru/'
-    }
-    
-    all_product_urls = []
-    
-    for section_name, section_url in sections.items():
-        print(f"\n=== COLETANDO {section_name} ===")
-        product_urls = get_product_urls_from_section(section_url)
-        all_product_urls.extend(product_urls)
-        
-        # Pausa entre requisições para ser respeitoso
-        time.sleep(1)
-    
-    # Remove duplicatas finais
-    final_urls = list(dict.fromkeys(all_product_urls))
+    base_url = base_url or BASE_URL
+    retrier = retrier or Retrier()
+    crawler = BFSCrawler(base_url, max_depth=max_depth, max_pages=max_pages, workers=workers,
+                         rate=rate, depth_rates=depth_rates, visited=visited, cache=cache,
+                         archive=archive, limiter=limiter, retrier=retrier, on_progress=on_progress,
+                         metrics=metrics)
+    yield from crawler.iter_products()
     
     print(f"\n=== RESULTADO DA COLETA ===")
-    print(f"Total de URLs únicas coletadas: {len(final_urls)}")
-    
-    return final_urls
+    print(f"Total de URLs únicas coletadas: {crawler.stats['products']}")
+    print(crawler.format_stats())
+    print(http_client.format_connection_stats())
+    if cache:
+        print(cache.format_stats())
+    if limiter is not None:
+        print(limiter.format_stats())
+    print(retrier.format_stats())
+    print(crawler.metrics.format_stats())
+
+def collect_all_product_urls(**options):
+    """
+    Coleta URLs de produtos de todo o catálogo de uma vez
+    Aceita as mesmas opções de iter_product_urls
+    """
+    return list(iter_product_urls(**options))
+
+def parse_depth_rates(values):
+    """
+    Converte as opções --depth-rate NÍVEL:TAXA em {nível: taxa}
+    Ex: ['0:0.5', '2:4'] -> {0: 0.5, 2: 4.0}
+    """
+    depth_rates = {}
+    for value in values or []:
+        depth, _, rate = value.partition(':')
+        try:
+            depth_rates[int(depth)] = float(rate)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Formato inválido em --depth-rate: {value} (use NÍVEL:TAXA)")
+    return depth_rates
 
 def save_urls_to_json(urls, filename='product_urls.json'):
     """
@@ -150,18 +108,103 @@ def save_urls_to_json(urls, filename='product_urls.json'):
         json.dump(urls, f, indent=2, ensure_ascii=False)
     print(f"URLs salvas em: {filename}")
 
-if __name__ == "__main__":
-    print("=== COLETOR DE URLs DE PRODUTOS PERDIGÃO ===")
+def main(argv=None, on_progress=None):
+    """
+    Executa a coleta completa (também chamada em processo pelo main.py)
     
-    # Coleta todas as URLs
-    all_urls = collect_all_product_urls()
+    Args:
+        argv: Argumentos de linha de comando (None = sys.argv)
+        on_progress: Chamada como on_progress(baixadas, conhecidas) a cada página de listagem
     
-    # Filtra URLs para manter apenas produtos individuais
-    print(f"\n=== APLICANDO FILTRO ===")
-    filtered_urls = filter_product_urls(all_urls)
+    Returns:
+        Lista de URLs de produtos salva em URLS_PATH (dados/product_urls.json)
+    """
+    parser = argparse.ArgumentParser(description="Coletor de URLs de produtos Perdigão")
+    parser.add_argument('--cache', action='store_true',
+                        help="Usa o cache HTTP em disco com GET condicional (ETag/Last-Modified)")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="Validade em segundos para páginas sem validadores (implica --cache)")
+    parser.add_argument('--archive', action='store_true',
+                        help="Grava cada resposta no arquivo comprimido de HTML (dados/archive)")
+    parser.add_argument('--workers', type=int, default=SECTION_WORKERS,
+                        help=f"Páginas de listagem baixadas em paralelo (padrão: {SECTION_WORKERS})")
+    parser.add_argument('--rate', type=float, default=SECTION_RATE,
+                        help=f"Máximo de requisições por segundo ao site (padrão: {SECTION_RATE:g}; 0 = sem limite)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Ajusta as requisições simultâneas (até --workers) conforme latência, 429/503 e Retry-After")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="Novas tentativas para erros de conexão, 5xx e 429 (padrão: 2; 0 desativa)")
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help="Raiz do site (padrão: $PERDIGAO_BASE_URL ou https://www.perdigao.com.br/)")
+    parser.add_argument('--max-depth', type=int, default=CRAWL_MAX_DEPTH,
+                        help=f"Profundidade máxima do crawl a partir de /produtos/ (padrão: {CRAWL_MAX_DEPTH})")
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help="Máximo de páginas de listagem baixadas (padrão: sem limite)")
+    parser.add_argument('--depth-rate', action='append', default=[], metavar='NÍVEL:TAXA',
+                        help="Orçamento próprio de um nível do crawl, em requisições/s (ex: 0:0.5; pode repetir)")
+    parser.add_argument('--visited', choices=['set', 'bloom'], default='set',
+                        help="Conjunto de URLs visitadas: exato (set) ou filtro de Bloom de memória fixa (bloom)")
+    parser.add_argument('--sitemap', nargs='?', const='sitemap.xml', default=None, metavar='URL',
+                        help="Descobre os produtos pelo sitemap (padrão: <base-url>/sitemap.xml) em vez das seções")
+    parser.add_argument('--changed-since', default=None, metavar='DATA',
+                        help="Com --sitemap: separa as URLs com lastmod posterior a esta data (ex: 2025-07-01) "
+                             "para o scraper.py --changed")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Com --sitemap: separa as URLs alteradas desde a última extração incremental "
+                             "(dados/sitemap/state.json) para o scraper.py --changed")
+    parser.add_argument('--profile', action='store_true',
+                        help="Gera o perfil de CPU e memória da coleta em dados/profiles/coleta_<timestamp>/")
+    args = parser.parse_args(argv)
+    try:
+        depth_rates = parse_depth_rates(args.depth_rate)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    cache = HTTPCache(ttl=args.cache_ttl) if args.cache or args.cache_ttl is not None else None
+    # Páginas de seção ficam em um arquivo separado das páginas de produto
+    archive = HTMLArchive(name='secoes') if args.archive else None
+    limiter = get_shared_limiter(max_limit=args.workers) if args.adaptive else None
+    
+    print("=== COLETOR DE URLs DE PRODUTOS PERDIGÃO ===")
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profiler = RunProfiler(f"coleta_{timestamp}") if args.profile else None
+    with profile_stage(profiler, 'coleta'):
+        if args.sitemap:
+            # Uma leitura em streaming do sitemap no lugar das páginas de seção
+            sitemap_url = urljoin(args.base_url, args.sitemap)
+            since = sitemap.parse_lastmod(args.changed_since) if args.changed_since else None
+            if args.changed_since and since is None:
+                parser.error(f"Data inválida em --changed-since: {args.changed_since}")
+            print(f"\n=== LENDO SITEMAP {sitemap_url} ===")
+            # product_urls.json recebe sempre o catálogo completo; as alteradas ficam à parte
+            filtered_urls, changed_urls = sitemap.discover_product_urls(sitemap_url, args.base_url, since=since,
+                                                                        incremental=args.incremental, cache=cache,
+                                                                        limiter=limiter,
+                                                                        retrier=Retrier(max_attempts=args.retries + 1))
+            if cache:
+                print(cache.format_stats())
+            print(f"URLs de produtos: {len(filtered_urls)}")
+            if since is not None or args.incremental:
+                print(f"URLs alteradas: {len(changed_urls)} (em {sitemap.CHANGED_PATH}; "
+                      f"extraia com scraper.py --changed)")
+        else:
+            # Coleta todas as URLs
+            metrics = RunMetrics('coletor')
+            all_urls = collect_all_product_urls(cache=cache, archive=archive, base_url=args.base_url,
+                                                workers=args.workers, rate=args.rate, limiter=limiter,
+                                                retrier=Retrier(max_attempts=args.retries + 1),
+                                                max_depth=args.max_depth, max_pages=args.max_pages,
+                                                depth_rates=depth_rates, visited=args.visited,
+                                                on_progress=on_progress, metrics=metrics)
+            paths = metrics.export(timestamp)
+            print(f"Métricas salvas em: {paths['json']} | {paths['prometheus']}")
+            
+            # Filtra URLs para manter apenas produtos individuais
+            print(f"\n=== APLICANDO FILTRO ===")
+            filtered_urls = filter_product_urls(all_urls, base_url=args.base_url)
     
     # Salva URLs filtradas
-    save_urls_to_json(filtered_urls, 'dados/product_urls.json')
+    save_urls_to_json(filtered_urls, URLS_PATH)
     
     # Mostra algumas URLs como exemplo
     if filtered_urls:
@@ -169,4 +212,9 @@ if __name__ == "__main__":
         for i, url in enumerate(filtered_urls[:5]):
             print(f"{i+1}. {url}")
         if len(filtered_urls) > 5:
-            print(f"... e mais {len(filtered_urls) - 5} URLs") 
\ No newline at end of file
+            print(f"... e mais {len(filtered_urls) - 5} URLs")
+    
+    return filtered_urls
+
+if __name__ == "__main__":
+    main()
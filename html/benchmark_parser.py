@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark do parsing das páginas de produto
+Mede separadamente parsing, extração e limpeza para cada backend do
+BeautifulSoup, usando os HTMLs salvos nesta pasta, as páginas gravadas no
+arquivo (dados/archive/) e uma página sintética sem tabela nutricional.
+O resultado é salvo em JSON e comparado com a linha de base armazenada
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import bs4
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config'))
+from cleaning import clean_nutritional_frame
+from extractor import TARGETED_STRAINER, build_product_row, build_raw_row, extract_product
+from html_archive import DEFAULT_ARCHIVE_DIR, HTMLArchive
+from scraper import available_parsers
+
+
+HTML_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(os.path.dirname(HTML_DIR), 'dados', 'benchmarks')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+STAGES = ['parse_ms', 'extract_ms', 'clean_ms', 'total_ms']
+
+# Logger silencioso: os avisos de campos ausentes não interessam aqui
+_quiet_logger = logging.getLogger('benchmark_parser')
+_quiet_logger.addHandler(logging.NullHandler())
+_quiet_logger.propagate = False
+
+
+def make_no_table_page(content: bytes) -> bytes:
+    """
+    Gera uma página sem tabela nutricional (como a do "Pescoço de peru")
+    a partir de uma página de produto real
+    """
+    text = content.decode('utf-8', errors='replace')
+    text = re.sub(r'<table\b.*?</table>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'(<h1[^>]*>)[^<]*', r'\1Pescoço de Peru Temperado Congelado', text, count=1)
+    return text.encode('utf-8')
+
+
+def load_fixtures(html_dir: str = HTML_DIR, archive_dir: Optional[str] = DEFAULT_ARCHIVE_DIR,
+                  archive_limit: int = 50) -> List[Tuple[str, str, bytes]]:
+    """
+    Carrega as páginas usadas no benchmark
+
+    Args:
+        html_dir: Pasta com os HTMLs salvos (*.html)
+        archive_dir: Pasta do arquivo de páginas gravadas (None para ignorar)
+        archive_limit: Máximo de páginas lidas do arquivo
+
+    Returns:
+        Lista de (nome, url, html)
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(html_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            fixtures.append((os.path.basename(path), f"file://{path}", f.read()))
+
+    if archive_dir and os.path.exists(os.path.join(archive_dir, 'paginas.idx.jsonl')):
+        archive = HTMLArchive(archive_dir)
+        for index, (url, content) in enumerate(archive.iter_pages()):
+            if index >= archive_limit:
+                break
+            fixtures.append((f"archive:{url}", url, content))
+        archive.close()
+
+    if fixtures:
+        name, url, content = fixtures[0]
+        fixtures.append(('sintetico:sem_tabela', url, make_no_table_page(content)))
+    return fixtures
+
+
+def bench_config(fixtures: List[Tuple[str, str, bytes]], parser: str, targeted: bool,
+                 repeat: int) -> Dict[str, float]:
+    """
+    Mede uma combinação backend/modo de parsing
+
+    Cada estágio é cronometrado por página e fica o melhor tempo das
+    repetições (como no timeit, menos sensível a ruído); o resultado é a
+    média desses tempos em ms por página, mais a limpeza em lote do conjunto
+    """
+    parse_only = TARGETED_STRAINER if targeted else None
+    best: Dict[str, List[float]] = {stage: [float('inf')] * len(fixtures) for stage in STAGES}
+    raw_rows = []
+    fields_found = 0
+
+    for run in range(repeat):
+        for index, (name, url, content) in enumerate(fixtures):
+            start = time.perf_counter()
+            soup = BeautifulSoup(content, parser, parse_only=parse_only)
+            parsed = time.perf_counter()
+            product_name, porcao, nutritional_data = extract_product(soup, logger=_quiet_logger)
+            extracted = time.perf_counter()
+            build_product_row(url, product_name, porcao, nutritional_data, _quiet_logger)
+            cleaned = time.perf_counter()
+
+            elapsed = {
+                'parse_ms': parsed - start,
+                'extract_ms': extracted - parsed,
+                'clean_ms': cleaned - extracted,
+                'total_ms': cleaned - start,
+            }
+            for stage, seconds in elapsed.items():
+                best[stage][index] = min(best[stage][index], seconds * 1000)
+            if run == 0:
+                raw_rows.append(build_raw_row(url, product_name, porcao, nutritional_data))
+                fields_found += len(nutritional_data)
+
+    result = {stage: round(statistics.fmean(values), 4) for stage, values in best.items()}
+
+    # Limpeza vetorizada (--batch-clean) de todas as linhas de uma vez
+    batch_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean_nutritional_frame(pd.DataFrame(raw_rows), _quiet_logger)
+        batch_times.append((time.perf_counter() - start) * 1000 / len(raw_rows))
+    result['clean_batch_ms'] = round(min(batch_times), 4)
+    result['fields_found'] = fields_found
+    return result
+
+
+def run_benchmark(fixtures: List[Tuple[str, str, bytes]], parsers: List[str], repeat: int = 20) -> Dict:
+    """
+    Executa o benchmark para cada backend, com e sem parsing direcionado
+
+    Returns:
+        Dicionário serializável com o ambiente e os resultados por configuração
+    """
+    results = {}
+    for parser in parsers:
+        # O html5lib ignora o SoupStrainer, então só faz sentido o parsing completo
+        modes = [False] if parser == 'html5lib' else [True, False]
+        for targeted in modes:
+            key = f"{parser}/{'targeted' if targeted else 'full'}"
+            print(f"⏱️  {key}...")
+            results[key] = bench_config(fixtures, parser, targeted, repeat)
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'beautifulsoup': bs4.__version__,
+        'pandas': pd.__version__,
+        'repeat': repeat,
+        'fixtures': [name for name, url, content in fixtures],
+        'results': results,
+    }
+
+
+def compare_with_baseline(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Compara os tempos com a linha de base
+
+    Args:
+        current: Resultado atual (run_benchmark)
+        baseline: Resultado armazenado
+        tolerance: Piora relativa aceita antes de acusar regressão (0.10 = 10%)
+
+    Returns:
+        Lista de regressões encontradas (vazia se nenhuma)
+    """
+    regressions = []
+    print(f"\n📊 Comparação com a linha de base de {baseline.get('created_at', '?')}:")
+    print(f"{'configuração':<22} {'estágio':<15} {'base (ms)':>10} {'atual (ms)':>11} {'variação':>9}")
+    for key, stages in current['results'].items():
+        base_stages = baseline.get('results', {}).get(key)
+        if base_stages is None:
+            print(f"{key:<22} (sem linha de base)")
+            continue
+        for stage in STAGES + ['clean_batch_ms']:
+            base, now = base_stages.get(stage), stages.get(stage)
+            if not base or now is None:
+                continue
+            change = now / base - 1
+            flag = ''
+            if change > tolerance:
+                flag = ' ⚠️'
+                regressions.append(f"{key} {stage}: {base:.3f} -> {now:.3f} ms ({change:+.0%})")
+            print(f"{key:<22} {stage:<15} {base:>10.3f} {now:>11.3f} {change:>+9.0%}{flag}")
+    return regressions
+
+
+def print_results(current: Dict):
+    """Mostra a tabela de tempos por página (média, entre as páginas, do melhor tempo de cada uma)"""
+    print(f"\n📄 {len(current['fixtures'])} páginas x {current['repeat']} repetições "
+          f"(média do melhor tempo de cada página, em ms)")
+    print(f"{'configuração':<22} {'parse':>9} {'extração':>9} {'limpeza':>9} {'lote':>9} {'total':>9}")
+    for key, stages in current['results'].items():
+        print(f"{key:<22} {stages['parse_ms']:>9.3f} {stages['extract_ms']:>9.3f} {stages['clean_ms']:>9.3f} "
+              f"{stages['clean_batch_ms']:>9.3f} {stages['total_ms']:>9.3f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de parsing/extração/limpeza das páginas de produto")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="Repetições por página (padrão: 20)")
+    parser.add_argument('--parser', action='append', choices=['lxml', 'html5lib', 'html.parser'],
+                        help="Backend a medir (pode repetir; padrão: todos os instalados)")
+    parser.add_argument('--archive-limit', type=int, default=50,
+                        help="Máximo de páginas lidas de dados/archive/ (0 desativa)")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help="Arquivo JSON da linha de base")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Grava o resultado atual como nova linha de base")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Piora relativa tolerada antes de acusar regressão (padrão: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    fixtures = load_fixtures(archive_limit=args.archive_limit,
+                             archive_dir=DEFAULT_ARCHIVE_DIR if args.archive_limit > 0 else None)
+    if not fixtures:
+        print(f"❌ Nenhuma página encontrada em {HTML_DIR}")
+        return 1
+
+    parsers = args.parser or available_parsers()
+    missing = [name for name in parsers if name not in available_parsers()]
+    if missing:
+        print(f"❌ Backend não instalado: {', '.join(missing)}")
+        return 1
+
+    current = run_benchmark(fixtures, parsers, args.repeat)
+    print_results(current)
+
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = os.path.join(BENCHMARK_DIR, f"parser_{timestamp}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultado salvo em: {output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(current, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regressão(ões) acima de {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+        else:
+            print("\n✅ Nenhuma regressão em relação à linha de base")
+    elif not args.save_baseline:
+        print(f"\nℹ️  Sem linha de base em {args.baseline} (use --save-baseline para criar)")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"📌 Linha de base atualizada: {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
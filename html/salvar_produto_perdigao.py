@@ -6,8 +6,12 @@ Script para salvar o HTML da página do Mini Chicken Tradicional da Perdigão
 
 import requests
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config'))
+import http_client
+
 
 def salvar_html_produto():
     """Salva o HTML da página do Mini Chicken Tradicional"""
@@ -15,23 +19,13 @@ def salvar_html_produto():
     # URL da página do produto
     url = "https://www.perdigao.com.br/produtos/empanados/todos-os-empanados/mini-chicken-tradicional-275g/"
     
-    # Headers para simular um navegador real
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-    
     print("🔍 Salvando HTML da página do Mini Chicken Tradicional...")
     print(f"📄 URL: {url}")
     
     try:
         # Fazer requisição
         print("📡 Fazendo requisição...")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, timeout=30)
         
         # Verificar se a requisição foi bem-sucedida
         response.raise_for_status()
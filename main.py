@@ -15,11 +15,21 @@ FUNCIONALIDADES:
 
 import os
 import sys
+import io
 import time
 import glob
-import subprocess
+import threading
+from contextlib import contextmanager, redirect_stdout
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TextIO
+
+# Coletor e scraper rodam no mesmo processo: os módulos de config/ são importados como biblioteca
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+if CONFIG_DIR not in sys.path:
+    sys.path.insert(0, CONFIG_DIR)
+
+# Opção 8 do menu: passa --profile ao coletor e ao scraper
+modo_perfil = False
 
 # ============================================================================
 # 🎨 SISTEMA DE CORES ANSI PARA TERMINAL
@@ -58,20 +68,93 @@ def mostrar_banner():
 {Cores.RESET}"""
     print(banner)
 
-def mostrar_barra_progresso(texto: str, duracao: float = 2.0):
-    """Exibe uma barra de progresso animada"""
-    print(f"\n{Cores.AMARELO}⏳ {texto}...{Cores.RESET}")
-    barra_tamanho = 40
-    for i in range(barra_tamanho + 1):
-        progresso = i / barra_tamanho
-        barra = "█" * i + "░" * (barra_tamanho - i)
-        porcentagem = int(progresso * 100)
-        print(f"\r{Cores.VERDE}[{barra}] {porcentagem}%{Cores.RESET}", end="", flush=True)
-        time.sleep(duracao / barra_tamanho)
-    print()
+class BarraProgresso:
+    """Barra de progresso alimentada pelos eventos de conclusão de cada URL, com vazão e ETA"""
+    
+    def __init__(self, texto: str, unidade: str = "URLs", saida: Optional[TextIO] = None,
+                 intervalo: float = 0.1):
+        """
+        Args:
+            texto: Descrição da etapa
+            unidade: Nome dos itens contados (ex: "páginas", "produtos")
+            saida: Onde desenhar a barra (padrão: o terminal atual, antes de qualquer redirecionamento)
+            intervalo: Tempo mínimo entre redesenhos (segundos)
+        """
+        self.unidade = unidade
+        self.saida = saida or sys.stdout
+        self.intervalo = intervalo
+        self.inicio = time.monotonic()
+        self.concluidos = 0
+        self.total = 0
+        self._ultimo_desenho = 0.0
+        self._lock = threading.Lock()
+        print(f"\n{Cores.AMARELO}⏳ {texto}...{Cores.RESET}", file=self.saida, flush=True)
+    
+    def atualizar(self, concluidos: int, total: int):
+        """Registra o progresso; pode ser chamada de qualquer thread"""
+        with self._lock:
+            self.concluidos, self.total = concluidos, total
+            agora = time.monotonic()
+            if concluidos < total and agora - self._ultimo_desenho < self.intervalo:
+                return
+            self._ultimo_desenho = agora
+            self._desenhar(agora)
+    
+    def _desenhar(self, agora: float):
+        barra_tamanho = 40
+        progresso = self.concluidos / self.total if self.total else 0.0
+        preenchido = int(progresso * barra_tamanho)
+        barra = "█" * preenchido + "░" * (barra_tamanho - preenchido)
+        decorrido = agora - self.inicio
+        vazao = self.concluidos / decorrido if decorrido > 0 else 0.0
+        if self.concluidos >= self.total:
+            eta = "--:--"
+        elif vazao > 0:
+            eta = formatar_duracao((self.total - self.concluidos) / vazao)
+        else:
+            eta = "??:??"
+        print(f"\r{Cores.VERDE}[{barra}] {int(progresso * 100):3d}% {self.concluidos}/{self.total} "
+              f"{self.unidade} | {vazao:.1f}/s | ETA {eta}{Cores.RESET}\033[K",
+              end="", flush=True, file=self.saida)
+    
+    def finalizar(self):
+        """Fecha a linha da barra com o tempo total"""
+        with self._lock:
+            agora = time.monotonic()
+            if self.total:
+                self._desenhar(agora)
+            print(f"\n{Cores.AZUL}⏱️  {self.concluidos} {self.unidade} em "
+                  f"{formatar_duracao(agora - self.inicio)}{Cores.RESET}", file=self.saida, flush=True)
+
+def formatar_duracao(segundos: float) -> str:
+    """Formata segundos como MM:SS (ou H:MM:SS)"""
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}:{minutos:02d}:{segundos:02d}" if horas else f"{minutos:02d}:{segundos:02d}"
+
+@contextmanager
+def capturar_saida():
+    """
+    Guarda a saída detalhada do coletor/scraper (prints e logs) fora do terminal,
+    para não embaralhar a barra de progresso; os logs continuam em dados/logs/scraper_perdigao.jsonl
+    """
+    import log_setup
+    
+    # Antes do scraper: a configuração dele passa a só ajustar o nível
+    log_setup.setup_logging(console=False)
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        yield buffer
+
+def mostrar_erro_execucao(buffer: io.StringIO, linhas: int = 10):
+    """Mostra as últimas linhas da saída capturada, para diagnóstico"""
+    saida = [linha for linha in buffer.getvalue().splitlines() if linha.strip()]
+    for linha in saida[-linhas:]:
+        print(f"   {Cores.VERMELHO}{linha}{Cores.RESET}")
 
 def mostrar_menu():
     """Exibe o menu principal"""
+    estado_perfil = f"{Cores.VERDE}ligado{Cores.RESET}" if modo_perfil else "desligado"
     menu = f"""
 {Cores.AZUL}{Cores.BOLD}═══════════════════ MENU PRINCIPAL ═══════════════════{Cores.RESET}
 
@@ -87,6 +170,7 @@ def mostrar_menu():
 {Cores.VERDE}ℹ️  INFORMAÇÕES:{Cores.RESET}
   {Cores.AMARELO}6.{Cores.RESET} 📖 {Cores.BRANCO}Sobre o Programa{Cores.RESET} - Informações e estatísticas
   {Cores.AMARELO}7.{Cores.RESET} ❌ {Cores.BRANCO}Sair{Cores.RESET} - Encerrar programa
+  {Cores.AMARELO}8.{Cores.RESET} 🔬 {Cores.BRANCO}Modo Perfil{Cores.RESET} - Perfil de CPU e memória das próximas execuções ({estado_perfil})
 
 {Cores.AZUL}══════════════════════════════════════════════════════{Cores.RESET}
 """
@@ -95,7 +179,7 @@ def mostrar_menu():
 def obter_escolha() -> str:
     """Obtém a escolha do usuário"""
     try:
-        escolha = input(f"{Cores.MAGENTA}👉 Digite sua opção (1-7): {Cores.RESET}").strip()
+        escolha = input(f"{Cores.MAGENTA}👉 Digite sua opção (1-8): {Cores.RESET}").strip()
         return escolha
     except KeyboardInterrupt:
         print(f"\n\n{Cores.AMARELO}⚠️  Programa interrompido pelo usuário{Cores.RESET}")
@@ -105,40 +189,68 @@ def obter_escolha() -> str:
 # 🎯 FUNÇÕES ESPECÍFICAS DO PROJETO
 # ============================================================================
 
+def alternar_modo_perfil():
+    """Liga/desliga o --profile do coletor e do scraper nas próximas execuções"""
+    global modo_perfil
+    modo_perfil = not modo_perfil
+    if modo_perfil:
+        print(f"\n{Cores.VERDE}🔬 Modo perfil ligado{Cores.RESET}")
+        print(f"   📁 Cada etapa gera cProfile (.pstats), pilhas para flamegraph (.folded) e")
+        print(f"      pico/maiores alocações de memória (.txt) em {Cores.AMARELO}dados/profiles/{Cores.RESET}")
+        print(f"   ⚠️  As execuções ficam mais lentas enquanto o modo estiver ligado")
+    else:
+        print(f"\n{Cores.AMARELO}🔬 Modo perfil desligado{Cores.RESET}")
+
+def existe_execucao_interrompida() -> bool:
+    """Verifica se há um diário de extração interrompida (ou com falhas) em dados/journal"""
+    # Mesmo caminho absoluto usado pelo scraper, independente do diretório atual
+    from run_journal import JOURNAL_DIR
+    return bool(glob.glob(os.path.join(JOURNAL_DIR, '*.jsonl')))
+
+def coletar_urls() -> List[str]:
+    """Roda o coletor em processo, com a barra acompanhando as páginas de listagem"""
+    import url_collector
+    barra = BarraProgresso("Coletando URLs dos produtos", unidade="páginas")
+    with capturar_saida() as saida:
+        urls = url_collector.main(["--profile"] if modo_perfil else [], on_progress=barra.atualizar)
+    barra.finalizar()
+    if not urls:
+        mostrar_erro_execucao(saida)
+    return urls
+
+def extrair_dados(argumentos: Optional[List[str]] = None) -> Optional[str]:
+    """Roda o scraper em processo, com a barra acompanhando cada produto concluído"""
+    import scraper
+    barra = BarraProgresso("Extraindo dados nutricionais", unidade="produtos")
+    with capturar_saida() as saida:
+        argumentos = list(argumentos or [])
+        if modo_perfil:
+            argumentos.append("--profile")
+        arquivo = scraper.main(argumentos, on_progress=barra.atualizar)
+    barra.finalizar()
+    if not arquivo:
+        mostrar_erro_execucao(saida)
+    return arquivo
+
 def executar_coleta_urls():
     """Coleta URLs dos produtos da Perdigão"""
     print(f"\n{Cores.CIANO}{Cores.BOLD}🕷️  COLETANDO URLs DOS PRODUTOS{Cores.RESET}")
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
     print(f"\n{Cores.VERDE}✅ Configurações:{Cores.RESET}")
-    print(f"   📊 Seções: {Cores.AMARELO}12 categorias de produtos{Cores.RESET}")
+    print(f"   📊 Seções: {Cores.AMARELO}todo o catálogo a partir de /produtos/{Cores.RESET}")
     print(f"   📁 Saída: {Cores.AMARELO}dados/product_urls.json{Cores.RESET}")
-    print(f"   ⏱️  Tempo estimado: {Cores.AMARELO}2-3 minutos{Cores.RESET}")
     
     confirmar = input(f"\n{Cores.MAGENTA}🤔 Continuar? (s/N): {Cores.RESET}").lower()
     
     if confirmar in ['s', 'sim', 'y', 'yes']:
         try:
-            mostrar_barra_progresso("Iniciando coleta de URLs", 1.0)
-            
-            # Executar o coletor de URLs
-            resultado = subprocess.run([
-                sys.executable, "config/url_collector.py"
-            ], capture_output=True, text=True)
-            
-            if resultado.returncode == 0:
+            urls = coletar_urls()
+            if urls:
                 print(f"{Cores.VERDE}✅ URLs coletadas com sucesso!{Cores.RESET}")
-                
-                # Verificar se o arquivo foi criado
-                if os.path.exists("dados/product_urls.json"):
-                    with open("dados/product_urls.json", 'r', encoding='utf-8') as f:
-                        import json
-                        urls = json.load(f)
-                    print(f"{Cores.VERDE}📊 Total de URLs coletadas: {len(urls)}{Cores.RESET}")
-                else:
-                    print(f"{Cores.VERMELHO}❌ Arquivo de URLs não foi criado{Cores.RESET}")
+                print(f"{Cores.VERDE}📊 Total de URLs coletadas: {len(urls)}{Cores.RESET}")
             else:
-                print(f"{Cores.VERMELHO}❌ Erro na coleta: {resultado.stderr}{Cores.RESET}")
+                print(f"{Cores.VERMELHO}❌ Nenhuma URL de produto foi coletada{Cores.RESET}")
                 
         except Exception as e:
             print(f"\n{Cores.VERMELHO}❌ Erro durante execução: {e}{Cores.RESET}")
@@ -165,31 +277,24 @@ def executar_extracao_dados():
         print(f"\n{Cores.VERDE}✅ Configurações:{Cores.RESET}")
         print(f"   📊 URLs carregadas: {Cores.AMARELO}{len(urls)}{Cores.RESET}")
         print(f"   📁 Saída: {Cores.AMARELO}dados/produtos_perdigao_TIMESTAMP.csv{Cores.RESET}")
-        print(f"   ⏱️  Tempo estimado: {Cores.AMARELO}5-10 minutos{Cores.RESET}")
+        
+        argumentos = []
+        if existe_execucao_interrompida():
+            print(f"\n{Cores.AMARELO}♻️  Foi encontrada uma extração interrompida ou com URLs com falha{Cores.RESET}")
+            retomar = input(f"{Cores.MAGENTA}🤔 Retomar de onde parou? (s/N): {Cores.RESET}").lower()
+            if retomar in ['s', 'sim', 'y', 'yes']:
+                argumentos.append("--resume")
         
         confirmar = input(f"\n{Cores.MAGENTA}🤔 Continuar? (s/N): {Cores.RESET}").lower()
         
         if confirmar in ['s', 'sim', 'y', 'yes']:
             try:
-                mostrar_barra_progresso("Iniciando extração de dados", 1.0)
-                
-                # Executar o scraper
-                resultado = subprocess.run([
-                    sys.executable, "config/scraper.py"
-                ], capture_output=True, text=True)
-                
-                if resultado.returncode == 0:
+                arquivo = extrair_dados(argumentos)
+                if arquivo:
                     print(f"{Cores.VERDE}✅ Dados extraídos com sucesso!{Cores.RESET}")
-                    
-                    # Verificar arquivos CSV criados
-                    csv_files = glob.glob("dados/produtos_perdigao_*.csv")
-                    if csv_files:
-                        latest_file = max(csv_files, key=os.path.getctime)
-                        print(f"{Cores.VERDE}📁 Arquivo criado: {latest_file}{Cores.RESET}")
-                    else:
-                        print(f"{Cores.VERMELHO}❌ Nenhum arquivo CSV foi criado{Cores.RESET}")
+                    print(f"{Cores.VERDE}📁 Arquivo criado: {arquivo}{Cores.RESET}")
                 else:
-                    print(f"{Cores.VERMELHO}❌ Erro na extração: {resultado.stderr}{Cores.RESET}")
+                    print(f"{Cores.VERMELHO}❌ Nenhum arquivo de dados foi criado{Cores.RESET}")
                     
             except Exception as e:
                 print(f"\n{Cores.VERMELHO}❌ Erro durante execução: {e}{Cores.RESET}")
@@ -205,52 +310,28 @@ def executar_coleta_completa():
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
     print(f"\n{Cores.AMARELO}⚠️  ATENÇÃO:{Cores.RESET}")
-    print(f"   • Esta operação pode demorar {Cores.VERMELHO}10-15 minutos{Cores.RESET}")
-    print(f"   • Serão executadas as etapas 1 e 2 em sequência")
+    print(f"   • Coleta de URLs e extração rodam juntas: cada produto é extraído assim que é descoberto")
+    print(f"   • A lista de URLs também é salva em dados/product_urls.json")
     print(f"   • Certifique-se de ter uma conexão estável com a internet")
     
     confirmar = input(f"\n{Cores.MAGENTA}🤔 Continuar? (s/N): {Cores.RESET}").lower()
     
     if confirmar in ['s', 'sim', 'y', 'yes']:
         try:
-            # Etapa 1: Coletar URLs
-            print(f"\n{Cores.VERDE}🕷️  ETAPA 1: Coletando URLs...{Cores.RESET}")
-            mostrar_barra_progresso("Coletando URLs dos produtos", 2.0)
-            
-            resultado_urls = subprocess.run([
-                sys.executable, "config/url_collector.py"
-            ], capture_output=True, text=True)
-            
-            if resultado_urls.returncode != 0:
-                print(f"{Cores.VERMELHO}❌ Erro na coleta de URLs: {resultado_urls.stderr}{Cores.RESET}")
-                return
+            print(f"\n{Cores.VERDE}🕷️📊 Coletando URLs e extraindo dados nutricionais...{Cores.RESET}")
+            arquivo = extrair_dados(["--fused"])
             
-            print(f"{Cores.VERDE}✅ URLs coletadas com sucesso!{Cores.RESET}")
-            
-            # Etapa 2: Extrair dados
-            print(f"\n{Cores.VERDE}📊 ETAPA 2: Extraindo dados nutricionais...{Cores.RESET}")
-            mostrar_barra_progresso("Extraindo dados nutricionais", 3.0)
-            
-            resultado_dados = subprocess.run([
-                sys.executable, "config/scraper.py"
-            ], capture_output=True, text=True)
-            
-            if resultado_dados.returncode == 0:
+            if arquivo:
                 print(f"{Cores.VERDE}✅ Coleta completa finalizada com sucesso!{Cores.RESET}")
                 
-                # Verificar arquivos criados
                 if os.path.exists("dados/product_urls.json"):
                     with open("dados/product_urls.json", 'r', encoding='utf-8') as f:
                         import json
                         urls = json.load(f)
                     print(f"{Cores.VERDE}📊 URLs coletadas: {len(urls)}{Cores.RESET}")
-                
-                csv_files = glob.glob("dados/produtos_perdigao_*.csv")
-                if csv_files:
-                    latest_file = max(csv_files, key=os.path.getctime)
-                    print(f"{Cores.VERDE}📁 Arquivo de dados: {latest_file}{Cores.RESET}")
+                print(f"{Cores.VERDE}📁 Arquivo de dados: {arquivo}{Cores.RESET}")
             else:
-                print(f"{Cores.VERMELHO}❌ Erro na extração de dados: {resultado_dados.stderr}{Cores.RESET}")
+                print(f"{Cores.VERMELHO}❌ Erro na coleta completa{Cores.RESET}")
                 
         except Exception as e:
             print(f"\n{Cores.VERMELHO}❌ Erro: {e}{Cores.RESET}")
@@ -365,7 +446,7 @@ def mostrar_sobre():
     print(f"   dos produtos da Perdigão")
     
     print(f"\n{Cores.VERDE}📊 FUNCIONALIDADES:{Cores.RESET}")
-    print(f"   🕷️  Coleta URLs de 12 categorias de produtos")
+    print(f"   🕷️  Coleta URLs de todas as categorias de produtos")
     print(f"   📊 Extração de dados nutricionais completos")
     print(f"   🚀 Sistema automatizado de scraping")
     
@@ -438,8 +519,10 @@ def main():
         elif escolha == "7":
             print(f"\n{Cores.VERDE}👋 Obrigado por usar o Scraping Perdigão!{Cores.RESET}")
             break
+        elif escolha == "8":
+            alternar_modo_perfil()
         else:
-            print(f"\n{Cores.VERMELHO}❌ Opção inválida! Digite um número de 1 a 7.{Cores.RESET}")
+            print(f"\n{Cores.VERMELHO}❌ Opção inválida! Digite um número de 1 a 8.{Cores.RESET}")
         
         pausar()
 